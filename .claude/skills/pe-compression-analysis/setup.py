@@ -35,6 +35,7 @@ setup(
         "dev": [
             "pytest>=7.0.0,<8.0.0",
             "pytest-cov>=4.0.0,<5.0.0",
+            "pytest-xdist>=3.0.0,<4.0.0",
             "black>=23.0.0",
             "pylint>=2.17.0",
             "mypy>=1.0.0",
@@ -8,8 +8,14 @@ Tests cover:
 - Workflow action generation
 - Output formatting
 - Interface specification export
+
+The full-pipeline tests in ``TestIntegration`` are marked ``slow``; skip them
+while iterating on the connector with ``pytest -m "not slow"``.
 """
 
+import re
+from types import MappingProxyType
+
 import pytest
 from src.integration.workflow9_connector import (
     Workflow9Connector,
@@ -17,6 +23,102 @@ from src.integration.workflow9_connector import (
 )
 
 
+# Error-message patterns for pytest.raises(match=...), compiled once
+_MISSING_RE = re.compile("Missing required fields")
+_NOTDICT_RE = re.compile("must be a dictionary")
+_BADFMT_RE = re.compile("Unsupported output format")
+
+
+# Canonical analysis results, frozen so no test can mutate a shared shape.
+# Strict validation requires a real dict, so callers pass ``dict(...)``.
+_RES_BASIC = MappingProxyType({"mode": "basic"})
+_RES_BASIC_TEST = MappingProxyType({"mode": "basic", "symbol": "TEST"})
+_RES_OFFLINE = MappingProxyType({
+    "mode": "offline",
+    "limitations": ("Old cached data", "Limited peer comparison")
+})
+_RES_COMP_FULL_25 = MappingProxyType({
+    "mode": "full",
+    "compression_detected": True,
+    "compression_percentage": -25.0
+})
+_RES_COMP_FULL_30 = MappingProxyType({
+    "mode": "full",
+    "compression_detected": True,
+    "compression_percentage": -30.0
+})
+_RES_COMP_FULL_35 = MappingProxyType({
+    "mode": "full",
+    "compression_detected": True,
+    "compression_percentage": -35.0
+})
+_RES_STABLE_FULL = MappingProxyType({
+    "mode": "full",
+    "compression_detected": False
+})
+
+
+# Canonical actions shared by the read-only assertion tests. Each one is
+# prepared once per module; tests only inspect the returned package.
+
+@pytest.fixture(scope="module")
+def connector():
+    """Default connector shared across read-only tests.
+    
+    Inputs here are known-good, so validation is skipped; ``TestValidation``
+    uses ``strict_connector`` instead.
+    """
+    return Workflow9Connector(strict_validation=False)
+
+
+@pytest.fixture
+def strict_connector():
+    """Fresh strictly-validating connector (its error log is per-test)."""
+    return Workflow9Connector(strict_validation=True)
+
+
+@pytest.fixture(scope="module")
+def basic_action(connector):
+    """Basic-mode action without compression."""
+    return connector.prepare_workflow_action(dict(_RES_BASIC))
+
+
+@pytest.fixture(scope="module")
+def offline_action(connector):
+    """Offline-mode action carrying analysis limitations."""
+    return connector.prepare_workflow_action(dict(_RES_OFFLINE))
+
+
+@pytest.fixture(scope="module")
+def compression_full_action(connector):
+    """Full-mode action with medium (-25%) compression."""
+    return connector.prepare_workflow_action(dict(_RES_COMP_FULL_25))
+
+
+@pytest.fixture(scope="module")
+def threshold_full_action(connector):
+    """Full-mode action at the high-severity threshold (-30%)."""
+    return connector.prepare_workflow_action(dict(_RES_COMP_FULL_30))
+
+
+@pytest.fixture(scope="module")
+def critical_full_action(connector):
+    """Full-mode action with critical (-35%) compression."""
+    return connector.prepare_workflow_action(dict(_RES_COMP_FULL_35))
+
+
+@pytest.fixture(scope="module")
+def stable_full_action(connector):
+    """Full-mode action without compression."""
+    return connector.prepare_workflow_action(dict(_RES_STABLE_FULL))
+
+
+@pytest.fixture(scope="module")
+def spec(connector):
+    """Interface specification exported once per module."""
+    return connector.export_interface_specification()
+
+
 class TestConnectorInitialization:
     """Test suite for connector initialization."""
     
@@ -43,7 +145,7 @@ class TestConnectorInitialization:
     
     def test_invalid_output_format(self):
         """Test connector rejects invalid output format."""
-        with pytest.raises(ValueError, match="Unsupported output format"):
+        with pytest.raises(ValueError, match=_BADFMT_RE):
             Workflow9Connector(output_format="xml")
     
     def test_strict_validation_disabled(self):
@@ -74,13 +176,9 @@ class TestWorkflowActionPreparation:
         assert "workflow_actions" in action
         assert "outputs" in action
     
-    def test_metadata_structure(self):
+    def test_metadata_structure(self, basic_action):
         """Test metadata section structure."""
-        connector = Workflow9Connector()
-        results = {"mode": "basic"}
-        
-        action = connector.prepare_workflow_action(results)
-        metadata = action["metadata"]
+        metadata = basic_action["metadata"]
         
         assert metadata["skill_id"] == "pe-compression-analysis"
         assert metadata["interface_version"] == "1.0.0"
@@ -114,7 +212,7 @@ class TestWorkflowActionPreparation:
     def test_with_markdown_output(self):
         """Test action preparation with pre-rendered Markdown."""
         connector = Workflow9Connector()
-        results = {"mode": "basic", "symbol": "TEST"}
+        results = dict(_RES_BASIC_TEST)
         markdown = "# Test Markdown Output"
         
         action = connector.prepare_workflow_action(results, markdown_output=markdown)
@@ -125,7 +223,7 @@ class TestWorkflowActionPreparation:
     def test_last_output_storage(self):
         """Test that last output is stored correctly."""
         connector = Workflow9Connector()
-        results = {"mode": "basic"}
+        results = dict(_RES_BASIC)
         
         action = connector.prepare_workflow_action(results)
         
@@ -135,67 +233,34 @@ class TestWorkflowActionPreparation:
 class TestDecisionFramework:
     """Test suite for decision framework generation."""
     
-    def test_compression_alert_true(self):
+    def test_compression_alert_true(self, threshold_full_action):
         """Test decision framework with compression alert."""
-        connector = Workflow9Connector()
-        results = {
-            "mode": "full",
-            "compression_detected": True,
-            "compression_percentage": -30.0
-        }
-        
-        action = connector.prepare_workflow_action(results)
-        framework = action["decision_framework"]
+        framework = threshold_full_action["decision_framework"]
         
         assert framework["compression_alert"] is True
         assert framework["severity"] == "high"
         assert framework["confidence"] == "high"
     
-    def test_compression_alert_false(self):
+    def test_compression_alert_false(self, basic_action):
         """Test decision framework without compression."""
-        connector = Workflow9Connector()
-        results = {
-            "mode": "basic",
-            "compression_detected": False
-        }
-        
-        action = connector.prepare_workflow_action(results)
-        framework = action["decision_framework"]
+        framework = basic_action["decision_framework"]
         
         assert framework["compression_alert"] is False
         assert framework["severity"] == "low"
     
-    def test_severity_assessment_high(self):
+    def test_severity_assessment_high(self, critical_full_action):
         """Test high severity assessment."""
-        connector = Workflow9Connector()
-        results = {
-            "mode": "full",
-            "compression_detected": True,
-            "compression_percentage": -35.0
-        }
-        
-        action = connector.prepare_workflow_action(results)
-        
-        assert action["decision_framework"]["severity"] == "high"
-        assert action["analysis"]["status"] == "critical"
+        assert critical_full_action["decision_framework"]["severity"] == "high"
+        assert critical_full_action["analysis"]["status"] == "critical"
     
-    def test_severity_assessment_medium(self):
+    def test_severity_assessment_medium(self, compression_full_action):
         """Test medium severity assessment."""
-        connector = Workflow9Connector()
-        results = {
-            "mode": "full",
-            "compression_detected": True,
-            "compression_percentage": -25.0
-        }
-        
-        action = connector.prepare_workflow_action(results)
-        
-        assert action["decision_framework"]["severity"] == "medium"
-        assert action["analysis"]["status"] == "alert"
+        assert compression_full_action["decision_framework"]["severity"] == "medium"
+        assert compression_full_action["analysis"]["status"] == "alert"
     
     def test_severity_assessment_low(self):
         """Test low severity assessment."""
-        connector = Workflow9Connector()
+        connector = Workflow9Connector(strict_validation=False)
         results = {
             "mode": "full",
             "compression_detected": True,
@@ -206,135 +271,77 @@ class TestDecisionFramework:
         
         assert action["decision_framework"]["severity"] == "low"
     
-    def test_confidence_full_mode(self):
+    def test_confidence_full_mode(self, stable_full_action):
         """Test confidence assessment for full mode."""
-        connector = Workflow9Connector()
-        results = {"mode": "full"}
-        
-        action = connector.prepare_workflow_action(results)
-        
-        assert action["decision_framework"]["confidence"] == "high"
+        assert stable_full_action["decision_framework"]["confidence"] == "high"
     
-    def test_confidence_basic_mode(self):
+    def test_confidence_basic_mode(self, basic_action):
         """Test confidence assessment for basic mode."""
-        connector = Workflow9Connector()
-        results = {"mode": "basic"}
-        
-        action = connector.prepare_workflow_action(results)
-        
-        assert action["decision_framework"]["confidence"] == "medium"
+        assert basic_action["decision_framework"]["confidence"] == "medium"
     
-    def test_confidence_offline_mode(self):
+    def test_confidence_offline_mode(self, offline_action):
         """Test confidence assessment for offline mode."""
-        connector = Workflow9Connector()
-        results = {"mode": "offline"}
-        
-        action = connector.prepare_workflow_action(results)
-        
-        assert action["decision_framework"]["confidence"] == "low"
+        assert offline_action["decision_framework"]["confidence"] == "low"
     
-    def test_risk_factors_extraction(self):
+    def test_risk_factors_extraction(self, offline_action):
         """Test risk factors extraction."""
-        connector = Workflow9Connector()
-        results = {
-            "mode": "offline",
-            "limitations": ["Old cached data", "Limited peer comparison"]
-        }
-        
-        action = connector.prepare_workflow_action(results)
-        risks = action["decision_framework"]["risk_factors"]
+        risks = offline_action["decision_framework"]["risk_factors"]
         
         assert len(risks) > 0
-        assert any("offline mode" in risk.lower() for risk in risks)
+        assert "offline mode" in " \n ".join(risks).lower()
         assert "Old cached data" in risks
         assert "Limited peer comparison" in risks
     
-    def test_next_actions_compression(self):
+    def test_next_actions_compression(self, compression_full_action):
         """Test next actions for compression scenario."""
-        connector = Workflow9Connector()
-        results = {
-            "mode": "full",
-            "compression_detected": True
-        }
-        
-        action = connector.prepare_workflow_action(results)
-        next_actions = action["decision_framework"]["next_actions"]
+        next_actions = compression_full_action["decision_framework"]["next_actions"]
         
         assert len(next_actions) > 0
-        assert any("earnings" in action.lower() for action in next_actions)
-        assert any("cash flow" in action.lower() for action in next_actions)
+        blob = " \n ".join(next_actions).lower()
+        assert "earnings" in blob
+        assert "cash flow" in blob
     
-    def test_next_actions_stable(self):
+    def test_next_actions_stable(self, stable_full_action):
         """Test next actions for stable scenario."""
-        connector = Workflow9Connector()
-        results = {
-            "mode": "full",
-            "compression_detected": False
-        }
-        
-        action = connector.prepare_workflow_action(results)
-        next_actions = action["decision_framework"]["next_actions"]
+        next_actions = stable_full_action["decision_framework"]["next_actions"]
         
         assert len(next_actions) > 0
-        assert any("monitor" in action.lower() for action in next_actions)
+        assert "monitor" in " \n ".join(next_actions).lower()
 
 
 class TestWorkflowActions:
     """Test suite for workflow action generation."""
     
-    def test_compression_workflow_actions(self):
+    def test_compression_workflow_actions(self, compression_full_action):
         """Test workflow actions generated for compression."""
-        connector = Workflow9Connector()
-        results = {
-            "mode": "full",
-            "compression_detected": True,
-            "compression_percentage": -25.0
-        }
-        
-        action = connector.prepare_workflow_action(results)
-        workflow_actions = action["workflow_actions"]
+        workflow_actions = compression_full_action["workflow_actions"]
         
         assert len(workflow_actions) > 0
+        by_type = {a["action_type"]: a for a in workflow_actions}
         
         # Check for high-priority alert
-        alert_action = next((a for a in workflow_actions if a["action_type"] == "alert"), None)
-        assert alert_action is not None
-        assert alert_action["priority"] == "high"
-        assert "target_workflow" in alert_action
-        
-        # Check for research action
-        research_action = next((a for a in workflow_actions if a["action_type"] == "research"), None)
-        assert research_action is not None
+        assert "alert" in by_type
+        assert by_type["alert"]["priority"] == "high"
+        assert "target_workflow" in by_type["alert"]
         
-        # Check for comparison action
-        comparison_action = next((a for a in workflow_actions if a["action_type"] == "comparison"), None)
-        assert comparison_action is not None
+        # Check for research and comparison actions
+        assert "research" in by_type
+        assert "comparison" in by_type
     
-    def test_stable_workflow_actions(self):
+    def test_stable_workflow_actions(self, stable_full_action):
         """Test workflow actions for stable scenario."""
-        connector = Workflow9Connector()
-        results = {
-            "mode": "full",
-            "compression_detected": False
-        }
-        
-        action = connector.prepare_workflow_action(results)
-        workflow_actions = action["workflow_actions"]
+        workflow_actions = stable_full_action["workflow_actions"]
         
         assert len(workflow_actions) > 0
+        by_type = {a["action_type"]: a for a in workflow_actions}
         
         # Check for monitor action
-        monitor_action = next((a for a in workflow_actions if a["action_type"] == "monitor"), None)
-        assert monitor_action is not None
-        assert monitor_action["priority"] == "low"
+        assert "monitor" in by_type
+        assert by_type["monitor"]["priority"] == "low"
     
-    def test_action_structure(self):
+    def test_action_structure(self, compression_full_action):
         """Test workflow action structure."""
-        connector = Workflow9Connector()
-        results = {"mode": "full", "compression_detected": True}
-        
-        action = connector.prepare_workflow_action(results)
-        workflow_actions = action["workflow_actions"]
+        workflow_actions = compression_full_action["workflow_actions"]
         
         for wf_action in workflow_actions:
             assert "action_type" in wf_action
@@ -346,42 +353,24 @@ class TestWorkflowActions:
 class TestOutputFormatting:
     """Test suite for output formatting."""
     
-    def test_json_only_output(self):
-        """Test JSON-only output format."""
-        connector = Workflow9Connector(output_format="json")
-        results = {"mode": "basic", "symbol": "TEST"}
-        
-        action = connector.prepare_workflow_action(results)
-        outputs = action["outputs"]
-        
-        assert "json" in outputs
-        assert "markdown" not in outputs
-    
-    def test_markdown_only_output(self):
-        """Test Markdown-only output format."""
-        connector = Workflow9Connector(output_format="markdown")
-        results = {"mode": "basic", "symbol": "TEST"}
+    @pytest.mark.parametrize("fmt,expected,forbidden", [
+        ("json", {"json"}, {"markdown"}),
+        ("markdown", {"markdown"}, {"json"}),
+        ("both", {"json", "markdown"}, set()),
+    ])
+    def test_output_format_filters(self, fmt, expected, forbidden):
+        """Test each output format emits only its own outputs."""
+        connector = Workflow9Connector(output_format=fmt, strict_validation=False)
+        results = dict(_RES_BASIC_TEST)
         
-        action = connector.prepare_workflow_action(results)
-        outputs = action["outputs"]
-        
-        assert "markdown" in outputs
-        assert "json" not in outputs
-    
-    def test_both_outputs(self):
-        """Test both output formats."""
-        connector = Workflow9Connector(output_format="both")
-        results = {"mode": "basic", "symbol": "TEST"}
-        
-        action = connector.prepare_workflow_action(results)
-        outputs = action["outputs"]
+        outputs = connector.prepare_workflow_action(results)["outputs"]
         
-        assert "json" in outputs
-        assert "markdown" in outputs
+        assert expected <= outputs.keys()
+        assert not (forbidden & outputs.keys())
     
     def test_simple_markdown_generation(self):
         """Test simple Markdown generation."""
-        connector = Workflow9Connector(output_format="markdown")
+        connector = Workflow9Connector(output_format="markdown", strict_validation=False)
         results = {
             "mode": "full",
             "symbol": "AAPL",
@@ -399,29 +388,25 @@ class TestOutputFormatting:
 class TestValidation:
     """Test suite for input validation."""
     
-    def test_validation_with_valid_data(self):
+    def test_validation_with_valid_data(self, strict_connector):
         """Test validation passes with valid data."""
-        connector = Workflow9Connector(strict_validation=True)
-        results = {"mode": "basic"}
+        results = dict(_RES_BASIC)
         
         # Should not raise
-        action = connector.prepare_workflow_action(results)
+        action = strict_connector.prepare_workflow_action(results)
         assert action is not None
     
-    def test_validation_missing_required_field(self):
+    def test_validation_missing_required_field(self, strict_connector):
         """Test validation fails with missing required field."""
-        connector = Workflow9Connector(strict_validation=True)
         results = {}  # Missing 'mode'
         
-        with pytest.raises(Workflow9InterfaceError, match="Missing required fields"):
-            connector.prepare_workflow_action(results)
+        with pytest.raises(Workflow9InterfaceError, match=_MISSING_RE):
+            strict_connector.prepare_workflow_action(results)
     
-    def test_validation_non_dict_input(self):
+    def test_validation_non_dict_input(self, strict_connector):
         """Test validation fails with non-dictionary input."""
-        connector = Workflow9Connector(strict_validation=True)
-        
-        with pytest.raises(Workflow9InterfaceError, match="must be a dictionary"):
-            connector.prepare_workflow_action("not a dict")
+        with pytest.raises(Workflow9InterfaceError, match=_NOTDICT_RE):
+            strict_connector.prepare_workflow_action("not a dict")
     
     def test_validation_disabled(self):
         """Test validation can be disabled."""
@@ -432,43 +417,35 @@ class TestValidation:
         action = connector.prepare_workflow_action(results)
         assert action is not None
     
-    def test_error_log_on_validation_failure(self):
+    def test_error_log_on_validation_failure(self, strict_connector):
         """Test error log is populated on validation failure."""
-        connector = Workflow9Connector(strict_validation=True)
-        
         try:
-            connector.prepare_workflow_action({})
+            strict_connector.prepare_workflow_action({})
         except Workflow9InterfaceError:
             pass
         
-        errors = connector.get_error_log()
+        errors = strict_connector.get_error_log()
         assert len(errors) > 0
         assert "Missing required fields" in errors[0]
     
-    def test_clear_error_log(self):
+    def test_clear_error_log(self, strict_connector):
         """Test error log can be cleared."""
-        connector = Workflow9Connector(strict_validation=True)
-        
         try:
-            connector.prepare_workflow_action({})
+            strict_connector.prepare_workflow_action({})
         except Workflow9InterfaceError:
             pass
         
-        assert len(connector.get_error_log()) > 0
+        assert len(strict_connector.get_error_log()) > 0
         
-        connector.clear_error_log()
-        assert len(connector.get_error_log()) == 0
+        strict_connector.clear_error_log()
+        assert len(strict_connector.get_error_log()) == 0
 
 
 class TestInterfaceSpecification:
     """Test suite for interface specification export."""
     
-    def test_export_specification(self):
+    def test_export_specification(self, spec):
         """Test interface specification export."""
-        connector = Workflow9Connector()
-        
-        spec = connector.export_interface_specification()
-        
         assert spec["interface_version"] == "1.0.0"
         assert spec["skill_id"] == "pe-compression-analysis"
         assert "supported_formats" in spec
@@ -476,22 +453,16 @@ class TestInterfaceSpecification:
         assert "output_contract" in spec
         assert "workflow_actions" in spec
     
-    def test_input_contract(self):
+    def test_input_contract(self, spec):
         """Test input contract specification."""
-        connector = Workflow9Connector()
-        
-        spec = connector.export_interface_specification()
         input_contract = spec["input_contract"]
         
         assert "required_fields" in input_contract
         assert "mode" in input_contract["required_fields"]
         assert "optional_fields" in input_contract
     
-    def test_output_contract(self):
+    def test_output_contract(self, spec):
         """Test output contract specification."""
-        connector = Workflow9Connector()
-        
-        spec = connector.export_interface_specification()
         output_contract = spec["output_contract"]
         
         assert "sections" in output_contract
@@ -500,11 +471,8 @@ class TestInterfaceSpecification:
         for section in expected_sections:
             assert section in output_contract["sections"]
     
-    def test_workflow_actions_spec(self):
+    def test_workflow_actions_spec(self, spec):
         """Test workflow actions specification."""
-        connector = Workflow9Connector()
-        
-        spec = connector.export_interface_specification()
         workflow_actions = spec["workflow_actions"]
         
         assert len(workflow_actions) > 0
@@ -516,9 +484,10 @@ class TestInterfaceSpecification:
 class TestIntegration:
     """Integration tests for complete workflow."""
     
+    @pytest.mark.slow
     def test_complete_compression_workflow(self):
         """Test complete workflow for compression scenario."""
-        connector = Workflow9Connector()
+        connector = Workflow9Connector(strict_validation=False)
         results = {
             "mode": "full",
             "symbol": "AAPL",
@@ -555,9 +524,10 @@ class TestIntegration:
         assert "markdown" in action["outputs"]
         assert action["outputs"]["markdown"] == markdown
     
+    @pytest.mark.slow
     def test_complete_stable_workflow(self):
         """Test complete workflow for stable scenario."""
-        connector = Workflow9Connector(output_format="json")
+        connector = Workflow9Connector(output_format="json", strict_validation=False)
         results = {
             "mode": "basic",
             "symbol": "GOOGL",
@@ -577,7 +547,8 @@ class TestIntegration:
         # Verify monitoring actions
         workflow_actions = action["workflow_actions"]
         assert len(workflow_actions) > 0
-        assert any(a["action_type"] == "monitor" for a in workflow_actions)
+        by_type = {a["action_type"]: a for a in workflow_actions}
+        assert "monitor" in by_type
 
 
 if __name__ == "__main__":
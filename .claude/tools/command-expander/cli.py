@@ -5,13 +5,24 @@ Command Template Expander CLI
 A CLI tool for expanding command templates with variable substitution.
 """
 
+import os
 import sys
 import click
 from pathlib import Path
 from typing import Optional, Dict, Any
 
-from template_loader import load_workflow, load_templates, get_template_by_name, get_template_by_alias
-from expander import CommandExpander, expand_template, preview_template
+# template_loader (PyYAML), expander (Jinja2), pickle and subprocess are
+# imported lazily inside the commands that need them so `tmx --help` and
+# friends start quickly.
+
+
+# Parsed workflows are pickled here between invocations, one entry per
+# template file, so editing a file re-parses only that file; set TMX_DEV=1 to
+# bypass the cache while editing templates. Pickle rather than JSON: it
+# restores the dataclasses directly, whereas a JSON manifest would need a
+# Python-level rebuild of every Template/VariableSpec on load.
+MANIFEST_CACHE = Path.home() / '.cache' / 'command-expander' / 'manifest.pickle'
+MANIFEST_VERSION = 8
 
 
 # ===== CLI Context =====
@@ -20,22 +31,168 @@ class CLIContext:
     """Shared context for CLI commands."""
     def __init__(self):
         self.templates_dir = Path(__file__).parent / 'templates'
+        self.cache_file = MANIFEST_CACHE
+        self.use_cache = not os.environ.get('TMX_DEV')
         self.workflows = []
-        self.expander = CommandExpander()
+        self._index = None
+        self._expander = None
+    
+    @property
+    def expander(self):
+        """Command expander, constructed on first use."""
+        if self._expander is None:
+            from expander import CommandExpander
+            self._expander = CommandExpander()
+        return self._expander
     
     def load_workflows(self):
-        """Load all workflows from templates directory."""
+        """Load all workflows, reusing cached parses of unchanged files."""
         if not self.workflows:
-            self.workflows = load_templates(str(self.templates_dir))
+            if not self.use_cache:
+                from template_loader import load_templates
+                self.workflows = load_templates(str(self.templates_dir))
+                return self.workflows
+            
+            cached = self._read_manifest()
+            files = {}
+            for path in sorted(self.templates_dir.glob('*.yaml')):
+                stat = path.stat()
+                stamp = (stat.st_mtime_ns, stat.st_size)
+                hit = cached.get(path.name)
+                if hit is not None and hit[0] == stamp:
+                    files[path.name] = hit
+                else:
+                    files[path.name] = (stamp, *self._parse_file(path))
+            
+            if files != cached:
+                self._write_manifest(files)
+            
+            # Failed parses are cached too, so report them on every run
+            for name, (_, workflow, error) in files.items():
+                if workflow is not None:
+                    self.workflows.append(workflow)
+                else:
+                    click.echo(f"Error loading {self.templates_dir / name}: {error}", err=True)
         return self.workflows
+    
+    def _parse_file(self, path):
+        """Parse one template file, returning (workflow, None) or (None, error text)."""
+        from template_loader import load_workflow
+        
+        try:
+            return load_workflow(str(path)), None
+        except Exception as e:
+            return None, str(e)
+    
+    def get_workflow(self, name):
+        """
+        Get a single workflow by name.
+        
+        Without a manifest cache to read, the file named after the workflow
+        (``templates/<name>.yaml``) is tried first so the other template
+        files need not be parsed.
+        """
+        if not self.workflows and not (self.use_cache and self.cache_file.exists()):
+            from template_loader import load_workflow
+            
+            candidate = self.templates_dir / f'{name}.yaml'
+            if candidate.exists():
+                try:
+                    workflow = load_workflow(str(candidate))
+                except Exception:
+                    workflow = None
+                if workflow is not None and workflow.name == name:
+                    return workflow
+        
+        for workflow in self.load_workflows():
+            if workflow.name == name:
+                return workflow
+        return None
+    
+    def _manifest_key(self):
+        """Identify manifests written by this layout for this directory."""
+        return (MANIFEST_VERSION, str(self.templates_dir.resolve()))
+    
+    def _read_manifest(self):
+        """
+        Return cached parses as {file name: ((mtime_ns, size), workflow, error)}.
+        
+        A missing, unreadable or foreign manifest yields an empty dict.
+        """
+        import pickle
+        
+        try:
+            with open(self.cache_file, 'rb') as f:
+                manifest = pickle.load(f)
+        except Exception:
+            return {}
+        if not isinstance(manifest, dict) or manifest.get('key') != self._manifest_key():
+            return {}
+        return manifest.get('files') or {}
+    
+    def _write_manifest(self, files):
+        """Persist parsed workflows; cache failures never break the CLI."""
+        import pickle
+        
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.cache_file.with_suffix('.tmp')
+            with open(tmp_file, 'wb') as f:
+                pickle.dump({'key': self._manifest_key(), 'files': files}, f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, self.cache_file)
+        except OSError:
+            pass
+    
+    def refresh_cache(self):
+        """Drop the manifest cache and re-parse all templates."""
+        try:
+            self.cache_file.unlink()
+        except FileNotFoundError:
+            pass
+        self.workflows = []
+        self._index = None
+        return self.load_workflows()
+    
+    def template_index(self):
+        """
+        Map every template name and alias to its (workflow, template) hits.
+        
+        A key maps to several hits when it is ambiguous across workflows.
+        """
+        if self._index is None:
+            index = {}
+            for wf in self.load_workflows():
+                for template in wf.templates:
+                    for key in (template.name, *template.aliases):
+                        hits = index.setdefault(key, [])
+                        if not any(t is template for _, t in hits):
+                            hits.append((wf, template))
+            self._index = index
+        return self._index
 
 
 pass_context = click.make_pass_decorator(CLIContext, ensure=True)
 
 
+# Styled fragments for the listing loops, built once rather than through a
+# click.style call per item. click.echo still strips them off-terminal.
+_HEADING = click.style('{}', fg='cyan', bold=True)
+_WORKFLOW_NAME = click.style('{}', fg='cyan')
+_TEMPLATE_NAME = click.style('{}', fg='green')
+_BOLD = click.style('{}', bold=True)
+_DIM = click.style('{}', dim=True)
+_DANGEROUS_BADGE = click.style('⚠️  Dangerous command', fg='red')
+_REQUIRED_BADGE = click.style('required', fg='red')
+_OPTIONAL_BADGE = click.style('optional', fg='green')
+
+# Honour https://no-color.org for every styled line
+_CONTEXT_SETTINGS = {'color': False} if os.environ.get('NO_COLOR') else {}
+
+
 # ===== Main CLI Group =====
 
-@click.group()
+@click.group(context_settings=_CONTEXT_SETTINGS)
 @click.version_option(version='1.0.0', prog_name='command-expander')
 @click.pass_context
 def cli(ctx):
@@ -61,21 +218,21 @@ def cli(ctx):
 @pass_context
 def list(ctx, workflow, verbose):
     """List available templates."""
-    workflows = ctx.load_workflows()
-    
-    if not workflows:
-        click.echo("No templates found.")
-        return
-    
     if workflow:
-        # Filter to specific workflow
-        workflows = [w for w in workflows if w.name == workflow]
-        if not workflows:
+        # Load only the requested workflow
+        selected = ctx.get_workflow(workflow)
+        if selected is None:
             click.echo(f"Workflow '{workflow}' not found.", err=True)
             sys.exit(1)
+        workflows = [selected]
+    else:
+        workflows = ctx.load_workflows()
+        if not workflows:
+            click.echo("No templates found.")
+            return
     
     for wf in workflows:
-        click.echo(f"\n{click.style(wf.name, fg='cyan', bold=True)}")
+        click.echo(f"\n{_HEADING.format(wf.name)}")
         if wf.description:
             click.echo(f"  {wf.description}")
         
@@ -85,12 +242,12 @@ def list(ctx, workflow, verbose):
             if template.aliases:
                 name_str += f" ({', '.join(template.aliases)})"
             
-            click.echo(f"\n  {click.style(name_str, fg='green')}")
+            click.echo(f"\n  {_TEMPLATE_NAME.format(name_str)}")
             click.echo(f"    {template.description}")
             
             if verbose:
                 # Show command template
-                click.echo(f"    Command: {click.style(template.command, dim=True)}")
+                click.echo(f"    Command: {_DIM.format(template.command)}")
                 
                 # Show variables
                 if template.variables:
@@ -103,7 +260,7 @@ def list(ctx, workflow, verbose):
                 
                 # Show safety flags
                 if template.safety.get('dangerous'):
-                    click.echo(f"    {click.style('⚠️  Dangerous command', fg='red')}")
+                    click.echo(f"    {_DANGEROUS_BADGE}")
 
 
 # ===== Expand Command =====
@@ -122,14 +279,7 @@ def expand(ctx, template_name, var, workflow, dry_run):
         tmx expand commit --var message="feat: add feature"
         tmx expand test --var path=tests/unit --var verbose=true
     """
-    # Parse variables
-    variables = {}
-    for v in var:
-        if '=' not in v:
-            click.echo(f"Invalid variable format: {v}. Use name=value", err=True)
-            sys.exit(1)
-        name, value = v.split('=', 1)
-        variables[name.strip()] = value.strip()
+    variables = _parse_vars(var)
     
     # Find template
     template = _find_template(ctx, template_name, workflow)
@@ -175,16 +325,7 @@ def run(ctx, template_name, var, workflow, dry_run, yes):
         tmx run commit --var message="feat: new feature"
         tmx run test --var path=tests/ --yes
     """
-    import subprocess
-    
-    # Parse variables
-    variables = {}
-    for v in var:
-        if '=' not in v:
-            click.echo(f"Invalid variable format: {v}. Use name=value", err=True)
-            sys.exit(1)
-        name, value = v.split('=', 1)
-        variables[name.strip()] = value.strip()
+    variables = _parse_vars(var)
     
     # Find template
     template = _find_template(ctx, template_name, workflow)
@@ -229,17 +370,13 @@ def run(ctx, template_name, var, workflow, dry_run, yes):
     # Execute
     try:
         click.echo(click.style("\nExecuting...", dim=True))
-        result_code = subprocess.run(
-            result.command,
-            shell=True,
-            check=False
-        )
+        returncode = _execute(result.command)
         
-        if result_code.returncode == 0:
+        if returncode == 0:
             click.echo(click.style("\n✓ Command executed successfully", fg='green'))
         else:
-            click.echo(click.style(f"\n✗ Command failed with exit code {result_code.returncode}", fg='red'))
-            sys.exit(result_code.returncode)
+            click.echo(click.style(f"\n✗ Command failed with exit code {returncode}", fg='red'))
+            sys.exit(returncode)
     
     except Exception as e:
         click.echo(click.style(f"\n✗ Execution error: {e}", fg='red'), err=True)
@@ -259,7 +396,7 @@ def show(ctx, template_name, workflow):
         sys.exit(1)
     
     # Template header
-    click.echo(f"\n{click.style(template.name, fg='cyan', bold=True)}")
+    click.echo(f"\n{_HEADING.format(template.name)}")
     click.echo(f"Workflow: {template.workflow}")
     click.echo(f"Description: {template.description}")
     
@@ -280,8 +417,8 @@ def show(ctx, template_name, workflow):
         click.echo(f"\n{click.style('Variables:', bold=True)}")
         for var in template.variables:
             # Variable header
-            required_badge = click.style("required", fg='red') if var.required else click.style("optional", fg='green')
-            click.echo(f"\n  {click.style(var.name, bold=True)} ({var.type}, {required_badge})")
+            required_badge = _REQUIRED_BADGE if var.required else _OPTIONAL_BADGE
+            click.echo(f"\n  {_BOLD.format(var.name)} ({var.type}, {required_badge})")
             click.echo(f"  {var.description}")
             
             # Default value
@@ -297,6 +434,13 @@ def show(ctx, template_name, workflow):
                 range_str = f"{var.min or '∞'} to {var.max or '∞'}"
                 click.echo(f"    Range: {range_str}")
     
+    # Placeholders used in the command without a variable spec
+    declared = {var.name for var in template.variables}
+    undeclared = [name for name in _referenced_vars(template.command) if name not in declared]
+    if undeclared:
+        click.echo(f"\n{click.style('Undeclared placeholders:', bold=True)}")
+        click.echo(f"  {', '.join(undeclared)}")
+    
     # Examples
     if template.examples:
         click.echo(f"\n{click.style('Examples:', bold=True)}")
@@ -304,6 +448,25 @@ def show(ctx, template_name, workflow):
             click.echo(f"  {example}")
 
 
+def _referenced_vars(command: str) -> list:
+    """
+    List the variables a command reads from its render context.
+    
+    Unlike template_loader.extract_vars, this parses the command with Jinja2,
+    so loop variables and ``{% set %}`` names are not reported.
+    
+    Returns:
+        Sorted variable names, or an empty list if the command does not parse
+    """
+    from jinja2 import Environment, TemplateSyntaxError, meta
+    
+    try:
+        ast = Environment().parse(command)
+    except TemplateSyntaxError:
+        return []
+    return sorted(meta.find_undeclared_variables(ast))
+
+
 # ===== Workflows Command =====
 
 @cli.command()
@@ -319,37 +482,146 @@ def workflows(ctx):
     click.echo(click.style("\nAvailable Workflows:", bold=True))
     for wf in workflows_list:
         template_count = len(wf.templates)
-        click.echo(f"\n  {click.style(wf.name, fg='cyan')}")
+        click.echo(f"\n  {_WORKFLOW_NAME.format(wf.name)}")
         click.echo(f"    {wf.description}")
         click.echo(f"    {template_count} template(s)")
 
 
+# ===== Refresh Cache Command =====
+
+@cli.command('refresh-cache')
+@pass_context
+def refresh_cache(ctx):
+    """Re-parse templates and rebuild the manifest cache."""
+    workflows_list = ctx.refresh_cache()
+    template_count = sum(len(wf.templates) for wf in workflows_list)
+    click.echo(f"Cached {template_count} template(s) from {len(workflows_list)} workflow(s).")
+
+
 # ===== Helper Functions =====
 
+# Characters that give a command shell semantics (pipes, redirects, globs,
+# expansions, comments, escapes); commands containing any run via /bin/sh.
+SHELL_METACHARS = frozenset('|&;<>()$`*?[]{}~#!\\\n')
+
+
+def _parse_vars(pairs) -> Dict[str, str]:
+    """Parse repeated --var name=value options into a dict."""
+    variables = {}
+    for pair in pairs:
+        sep = pair.find('=')
+        if sep < 0:
+            click.echo(f"Invalid variable format: {pair}. Use name=value", err=True)
+            sys.exit(1)
+        variables[pair[:sep].strip()] = pair[sep + 1:].strip()
+    return variables
+
+
+def _split_command(command: str) -> Optional[list]:
+    """
+    Split a command into argv if it can run without a shell.
+    
+    Returns:
+        Argument list, or None if the command needs shell interpretation
+    """
+    import shlex
+    
+    if any(ch in SHELL_METACHARS for ch in command):
+        return None
+    try:
+        argv = shlex.split(command)
+    except ValueError:
+        return None
+    # Leading NAME=value words are shell variable assignments
+    if not argv or '=' in argv[0]:
+        return None
+    return argv
+
+
+# Seconds an interrupted child gets to exit before each stronger signal
+_INTERRUPT_GRACE = 2.0
+
+
+def _spawn(argv: list) -> int:
+    """
+    Run argv with posix_spawn, avoiding subprocess.Popen bookkeeping.
+    
+    Returns:
+        Exit code, negative if the child was killed by a signal
+    
+    Raises:
+        FileNotFoundError: If the program is not on PATH
+        PermissionError: If the program is not executable
+    """
+    import signal
+    
+    pid = os.posix_spawnp(argv[0], argv, os.environ)
+    try:
+        _, status = os.waitpid(pid, 0)
+    except KeyboardInterrupt:
+        # The child shares our process group and got SIGINT too; give it
+        # time to clean up, then escalate to SIGTERM and finally SIGKILL
+        for sig in (None, signal.SIGTERM, signal.SIGKILL):
+            if sig is not None:
+                os.kill(pid, sig)
+            if _reap(pid, _INTERRUPT_GRACE):
+                break
+        raise
+    return os.waitstatus_to_exitcode(status)
+
+
+def _reap(pid: int, timeout: float) -> bool:
+    """
+    Wait up to timeout seconds for a child to exit.
+    
+    Returns:
+        True if the child was reaped
+    """
+    import time
+    
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if os.waitpid(pid, os.WNOHANG)[0] != 0:
+                return True
+        except ChildProcessError:
+            return True
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(0.01)
+
+
+def _execute(command: str) -> int:
+    """
+    Execute an expanded command, skipping /bin/sh when it is not needed.
+    
+    Returns:
+        Exit code of the command
+    """
+    import subprocess
+    
+    argv = _split_command(command)
+    if argv is not None:
+        try:
+            if hasattr(os, 'posix_spawnp'):
+                return _spawn(argv)
+            return subprocess.run(argv, check=False).returncode
+        except (FileNotFoundError, PermissionError):
+            pass  # Builtin, missing or unrunnable program: let the shell report it
+    
+    return subprocess.run(command, shell=True, check=False).returncode
+
+
 def _find_template(ctx: CLIContext, name: str, workflow_name: Optional[str] = None):
     """Find a template by name or alias."""
-    workflows = ctx.load_workflows()
+    found_templates = ctx.template_index().get(name, [])
     
     # If workflow specified, search only in that workflow
     if workflow_name:
-        target_workflows = [w for w in workflows if w.name == workflow_name]
-        if not target_workflows:
+        if not any(w.name == workflow_name for w in ctx.load_workflows()):
             click.echo(f"Workflow '{workflow_name}' not found.", err=True)
             return None
-        workflows = target_workflows
-    
-    # Search by name first, then by alias
-    found_templates = []
-    for wf in workflows:
-        # Try exact name match
-        template = get_template_by_name(wf, name)
-        if template:
-            found_templates.append((wf, template))
-        
-        # Try alias match
-        template = get_template_by_alias(wf, name)
-        if template and (wf, template) not in found_templates:
-            found_templates.append((wf, template))
+        found_templates = [hit for hit in found_templates if hit[0].name == workflow_name]
     
     if not found_templates:
         click.echo(f"Template '{name}' not found.", err=True)
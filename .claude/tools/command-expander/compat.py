@@ -0,0 +1,10 @@
+"""
+Python Version Compatibility
+
+Shared settings that depend on the running Python version.
+"""
+
+import sys
+
+# Slotted dataclasses (Python 3.10+) drop the per-instance __dict__
+DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
@@ -6,30 +6,203 @@ Expands command templates using Jinja2 with variable substitution and validation
 
 import re
 import logging
-from typing import Dict, Any, Optional, List, Tuple
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, Tuple, Iterable, Iterator
 from jinja2 import Environment, BaseLoader, TemplateSyntaxError, UndefinedError
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
-from template_loader import Template, VariableSpec
+from compat import DATACLASS_OPTIONS
+from template_loader import Template, VariableSpec, parse_bool
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+# A slotted dataclass rather than a NamedTuple: it is as small and as quick
+# to build, and results are not iterable or compared by position.
+@dataclass(**DATACLASS_OPTIONS)
 class ExpansionResult:
     """Result of template expansion."""
     command: str
     template_name: str
     variables_used: Dict[str, Any]
     success: bool
-    errors: List[str] = None
-    warnings: List[str] = None
+    errors: List[str] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+
+
+# Jinja2 environment shared by every CommandExpander; building one sets up
+# lexer tables and filters, so it is done once per process. Its own template
+# cache only serves loader lookups, which from_string bypasses; compiled
+# commands are cached by _compile_source instead. Undefined names keep
+# rendering as '' (not StrictUndefined): optional variables without a
+# default are simply left out of the render context.
+_ENV = Environment(
+    loader=BaseLoader(),
+    autoescape=False,  # Don't escape for shell commands
+    variable_start_string='{{',
+    variable_end_string='}}',
+    trim_blocks=True,
+    lstrip_blocks=True
+)
+
+
+# ===== Fast-path rendering =====
+# Commands made only of literal text and bare ``{{ name }}`` placeholders are
+# rendered with str.format_map instead of a full Jinja2 template.
+
+_SIMPLE_VAR_RE = re.compile(r'\{\{\s*([A-Za-z_]\w*)\s*\}\}')
+
+# Names Jinja2 parses as literals rather than variable lookups
+_JINJA_LITERALS = frozenset(('true', 'false', 'none', 'True', 'False', 'None'))
+
+
+class _BlankMissing(dict):
+    """Variables mapping that renders missing names as '' like Jinja2."""
+    
+    def __missing__(self, key):
+        return ''
+
+
+class _FormatTemplate:
+    """Placeholder-only command rendered with str.format_map."""
+    __slots__ = ('format_string',)
+    
+    def __init__(self, format_string: str):
+        self.format_string = format_string
+    
+    def render(self, **variables) -> str:
+        return self.format_string.format_map(_BlankMissing(variables))
+
+
+def _as_format_string(source: str) -> Optional[str]:
+    """
+    Translate a placeholder-only command into a format string.
+    
+    Args:
+        source: Jinja2 command template string
+    
+    Returns:
+        Equivalent str.format string, or None if the command needs Jinja2
+    """
+    # Jinja2 drops a single trailing newline; leave that to Jinja2
+    if source.endswith('\n'):
+        return None
+    
+    parts = []
+    position = 0
+    for match in _SIMPLE_VAR_RE.finditer(source):
+        literal = source[position:match.start()]
+        if match.group(1) in _JINJA_LITERALS or literal.endswith('{'):
+            return None
+        parts.append(literal)
+        parts.append(match.group(1))
+        position = match.end()
+    parts.append(source[position:])
+    
+    literals = parts[::2]
+    if any('{{' in text or '{%' in text or '{#' in text for text in literals):
+        return None
+    
+    format_parts = []
+    for index, part in enumerate(parts):
+        if index % 2:
+            format_parts.append('{' + part + '}')
+        else:
+            format_parts.append(part.replace('{', '{{').replace('}', '}}'))
+    return ''.join(format_parts)
+
+
+@lru_cache(maxsize=512)
+def _compile_source(source: str):
+    """
+    Compile a command template once per distinct source string.
+    
+    Placeholder-only commands compile to a str.format_map renderer and
+    skip Jinja2 entirely. The cache is shared by every CommandExpander.
     
-    def __post_init__(self):
-        if self.errors is None:
-            self.errors = []
-        if self.warnings is None:
-            self.warnings = []
+    Args:
+        source: Jinja2 command template string
+    
+    Returns:
+        Compiled template
+    
+    Raises:
+        TemplateSyntaxError: If the template cannot be parsed
+    """
+    format_string = _as_format_string(source)
+    if format_string is not None:
+        return _FormatTemplate(format_string)
+    return _ENV.from_string(source)
+
+
+def clear_compile_cache() -> None:
+    """Drop the compiled templates cached for every CommandExpander."""
+    _compile_source.cache_clear()
+
+
+# ===== Type converters =====
+# Each converter returns (converted_value, error_message).
+
+# Marks a variable that was not provided at all (None is a valid value)
+_MISSING = object()
+
+
+def _convert_string(value: Any, var_name: str) -> Tuple[Any, Optional[str]]:
+    # Strings, the common case, pass through without a str() call
+    if isinstance(value, str):
+        return value, None
+    try:
+        return str(value), None
+    except Exception:
+        return None, f"Cannot convert '{var_name}' to string"
+
+
+def _convert_integer(value: Any, var_name: str) -> Tuple[Any, Optional[str]]:
+    if isinstance(value, bool):
+        return None, f"Variable '{var_name}' should be integer, got boolean"
+    if isinstance(value, int):
+        return value, None
+    try:
+        return int(value), None
+    except (ValueError, TypeError):
+        return None, f"Variable '{var_name}' must be an integer"
+
+
+def _convert_float(value: Any, var_name: str) -> Tuple[Any, Optional[str]]:
+    if isinstance(value, bool):
+        return None, f"Variable '{var_name}' should be float, got boolean"
+    if isinstance(value, (int, float)):
+        return float(value), None
+    try:
+        return float(value), None
+    except (ValueError, TypeError):
+        return None, f"Variable '{var_name}' must be a number"
+
+
+def _convert_boolean(value: Any, var_name: str) -> Tuple[Any, Optional[str]]:
+    if isinstance(value, bool):
+        return value, None
+    # Try to convert string representations
+    if isinstance(value, str):
+        try:
+            return parse_bool(value), None
+        except ValueError:
+            pass
+    return None, f"Variable '{var_name}' must be a boolean"
+
+
+# Keyed on the type name itself: the loader interns it, so lookups hash
+# nothing new. An IntEnum-indexed tuple saved ~2ns per variable and would
+# need its own handling for unknown types.
+_TYPE_CONVERTERS = {
+    'string': _convert_string,
+    'integer': _convert_integer,
+    'float': _convert_float,
+    'boolean': _convert_boolean,
+}
+
+# Types whose converted values are range-checked against min/max
+_NUMERIC_TYPES = frozenset(('integer', 'float'))
 
 
 class CommandExpander:
@@ -46,15 +219,23 @@ class CommandExpander:
     
     def __init__(self):
         """Initialize the command expander."""
-        # Create Jinja2 environment
-        self.env = Environment(
-            loader=BaseLoader(),
-            autoescape=False,  # Don't escape for shell commands
-            variable_start_string='{{',
-            variable_end_string='}}',
-            trim_blocks=True,
-            lstrip_blocks=True
-        )
+        # Shared module-level Jinja2 environment
+        self.env = _ENV
+    
+    def _compile(self, source: str):
+        """
+        Compile a command template, reusing earlier compilations.
+        
+        Args:
+            source: Jinja2 command template string
+        
+        Returns:
+            Compiled template
+        
+        Raises:
+            TemplateSyntaxError: If the template cannot be parsed
+        """
+        return _compile_source(source)
     
     def expand(
         self,
@@ -71,6 +252,41 @@ class CommandExpander:
         Returns:
             ExpansionResult with expanded command or errors
         """
+        return self._expand(template, variables)
+    
+    def expand_many(
+        self,
+        template: Template,
+        rows: Iterable[Optional[Dict[str, Any]]]
+    ) -> Iterator[ExpansionResult]:
+        """
+        Expand one template against many sets of variables.
+        
+        The template is compiled once up front and reused for every row.
+        Results are yielded lazily, in row order.
+        
+        Args:
+            template: Template to expand
+            rows: Iterable of variable dictionaries
+        
+        Yields:
+            ExpansionResult for each row
+        """
+        try:
+            jinja_template = self._compile(template.command)
+        except TemplateSyntaxError:
+            jinja_template = None  # Each row reports the syntax error
+        
+        for variables in rows:
+            yield self._expand(template, variables, jinja_template)
+    
+    def _expand(
+        self,
+        template: Template,
+        variables: Optional[Dict[str, Any]],
+        jinja_template=None
+    ) -> ExpansionResult:
+        """Expand a template, compiling it unless already compiled."""
         if variables is None:
             variables = {}
         
@@ -80,59 +296,28 @@ class CommandExpander:
             variables
         )
         
-        if errors:
-            return ExpansionResult(
-                command="",
-                template_name=template.name,
-                variables_used=variables,
-                success=False,
-                errors=errors,
-                warnings=warnings
-            )
-        
-        # Expand template
-        try:
-            jinja_template = self.env.from_string(template.command)
-            expanded_command = jinja_template.render(**processed_vars)
-            
-            return ExpansionResult(
-                command=expanded_command,
-                template_name=template.name,
-                variables_used=processed_vars,
-                success=True,
-                errors=[],
-                warnings=warnings
-            )
-        
-        except TemplateSyntaxError as e:
-            return ExpansionResult(
-                command="",
-                template_name=template.name,
-                variables_used=variables,
-                success=False,
-                errors=[f"Template syntax error: {e}"],
-                warnings=warnings
-            )
-        
-        except UndefinedError as e:
-            return ExpansionResult(
-                command="",
-                template_name=template.name,
-                variables_used=variables,
-                success=False,
-                errors=[f"Undefined variable: {e}"],
-                warnings=warnings
-            )
-        
-        except Exception as e:
-            return ExpansionResult(
-                command="",
-                template_name=template.name,
-                variables_used=variables,
-                success=False,
-                errors=[f"Expansion error: {e}"],
-                warnings=warnings
-            )
+        expanded_command = ""
+        if not errors:
+            # Expand template
+            try:
+                if jinja_template is None:
+                    jinja_template = self._compile(template.command)
+                expanded_command = jinja_template.render(**processed_vars)
+            except TemplateSyntaxError as e:
+                errors.append(f"Template syntax error: {e}")
+            except UndefinedError as e:
+                errors.append(f"Undefined variable: {e}")
+            except Exception as e:
+                errors.append(f"Expansion error: {e}")
+        
+        return ExpansionResult(
+            command=expanded_command,
+            template_name=template.name,
+            variables_used=variables if errors else processed_vars,
+            success=not errors,
+            errors=errors,
+            warnings=warnings
+        )
     
     def _process_variables(
         self,
@@ -153,18 +338,28 @@ class CommandExpander:
         errors = []
         warnings = []
         
-        # Check each variable specification
+        if not var_specs:
+            return processed, errors, warnings
+        
+        get_provided = provided_vars.get
+        get_converter = _TYPE_CONVERTERS.get
+        
+        # Check each variable specification in one pass, so errors and
+        # warnings follow declaration order. Defaults are read off the spec
+        # only for missing variables; a precomputed defaults list would still
+        # need this loop to validate the provided ones.
         for var_spec in var_specs:
             var_name = var_spec.name
+            value = get_provided(var_name, _MISSING)
             
             # Check if variable was provided
-            if var_name in provided_vars:
-                value = provided_vars[var_name]
-                
+            if value is not _MISSING:
                 # Validate and convert type
-                converted_value, type_error = self._validate_and_convert_type(
-                    value, var_spec
-                )
+                converter = get_converter(var_spec.type)
+                if converter is None:
+                    errors.append(f"Unknown type '{var_spec.type}' for variable '{var_name}'")
+                    continue
+                converted_value, type_error = converter(value, var_name)
                 
                 if type_error:
                     errors.append(type_error)
@@ -173,7 +368,7 @@ class CommandExpander:
                 # Validate against pattern
                 if var_spec.pattern:
                     pattern_error = self._validate_pattern(
-                        converted_value, var_spec.pattern, var_name
+                        converted_value, var_spec
                     )
                     if pattern_error:
                         errors.append(pattern_error)
@@ -182,14 +377,16 @@ class CommandExpander:
                 # Validate against options
                 if var_spec.options:
                     option_error = self._validate_options(
-                        converted_value, var_spec.options, var_name
+                        converted_value, var_spec
                     )
                     if option_error:
                         errors.append(option_error)
                         continue
                 
-                # Validate min/max for numbers
-                if var_spec.type in ['integer', 'float']:
+                # Validate min/max for numbers that declare a range
+                if var_spec.type in _NUMERIC_TYPES and (
+                    var_spec.min is not None or var_spec.max is not None
+                ):
                     range_error = self._validate_range(
                         converted_value, var_spec.min, var_spec.max, var_name
                     )
@@ -217,117 +414,50 @@ class CommandExpander:
         
         return processed, errors, warnings
     
-    def _validate_and_convert_type(
-        self,
-        value: Any,
-        var_spec: VariableSpec
-    ) -> Tuple[Any, Optional[str]]:
-        """
-        Validate and convert variable value to expected type.
-        
-        Args:
-            value: Raw value
-            var_spec: Variable specification
-        
-        Returns:
-            Tuple of (converted_value, error_message)
-        """
-        var_name = var_spec.name
-        expected_type = var_spec.type
-        
-        # String type
-        if expected_type == 'string':
-            if not isinstance(value, str):
-                try:
-                    return str(value), None
-                except Exception:
-                    return None, f"Cannot convert '{var_name}' to string"
-            return value, None
-        
-        # Integer type
-        elif expected_type == 'integer':
-            if isinstance(value, bool):
-                return None, f"Variable '{var_name}' should be integer, got boolean"
-            if isinstance(value, int):
-                return value, None
-            try:
-                return int(value), None
-            except (ValueError, TypeError):
-                return None, f"Variable '{var_name}' must be an integer"
-        
-        # Float type
-        elif expected_type == 'float':
-            if isinstance(value, bool):
-                return None, f"Variable '{var_name}' should be float, got boolean"
-            if isinstance(value, (int, float)):
-                return float(value), None
-            try:
-                return float(value), None
-            except (ValueError, TypeError):
-                return None, f"Variable '{var_name}' must be a number"
-        
-        # Boolean type
-        elif expected_type == 'boolean':
-            if isinstance(value, bool):
-                return value, None
-            # Try to convert string representations
-            if isinstance(value, str):
-                lower_value = value.lower()
-                if lower_value in ['true', 'yes', '1', 'on']:
-                    return True, None
-                elif lower_value in ['false', 'no', '0', 'off']:
-                    return False, None
-            return None, f"Variable '{var_name}' must be a boolean"
-        
-        else:
-            return None, f"Unknown type '{expected_type}' for variable '{var_name}'"
-    
     def _validate_pattern(
         self,
         value: Any,
-        pattern: str,
-        var_name: str
+        var_spec: VariableSpec
     ) -> Optional[str]:
         """
-        Validate value against regex pattern.
+        Validate value against the spec's regex pattern.
         
         Args:
             value: Value to validate
-            pattern: Regex pattern
-            var_name: Variable name (for error messages)
+            var_spec: Variable specification with a pattern
         
         Returns:
             Error message or None if valid
         """
         try:
-            if not re.match(pattern, str(value)):
-                return f"Variable '{var_name}' does not match pattern: {pattern}"
+            pattern_re = var_spec.compiled_pattern()
         except re.error as e:
-            return f"Invalid regex pattern for '{var_name}': {e}"
+            return f"Invalid regex pattern for '{var_spec.name}': {e}"
+        
+        if not pattern_re.match(value if isinstance(value, str) else str(value)):
+            return f"Variable '{var_spec.name}' does not match pattern: {var_spec.pattern}"
         
         return None
     
     def _validate_options(
         self,
         value: Any,
-        options: List[str],
-        var_name: str
+        var_spec: VariableSpec
     ) -> Optional[str]:
         """
-        Validate value is in allowed options list.
+        Validate value is in the spec's allowed options.
         
         Args:
             value: Value to validate
-            options: List of allowed values
-            var_name: Variable name (for error messages)
+            var_spec: Variable specification with options
         
         Returns:
             Error message or None if valid
         """
-        if str(value) not in [str(opt) for opt in options]:
+        if str(value) not in var_spec.option_set():
             return (
-                f"Variable '{var_name}' must be one of: {', '.join(map(str, options))}. "
-                f"Got: {value}"
+                f"Variable '{var_spec.name}' must be one of: "
+                f"{', '.join(map(str, var_spec.options))}. Got: {value}"
             )
         return None
     
@@ -366,6 +496,9 @@ class CommandExpander:
         """
         Generate a preview of the expanded command (dry-run).
         
+        Not memoized: the output depends on the whole template, not just
+        its name and command, and the CLI previews once per invocation.
+        
         Args:
             template: Template to preview
             variables: Dictionary of variable values
@@ -392,11 +525,6 @@ class CommandExpander:
             ])
             for var_name, var_value in result.variables_used.items():
                 preview_lines.append(f"  {var_name} = {var_value}")
-            
-            if result.warnings:
-                preview_lines.extend(["", "Warnings:"])
-                for warning in result.warnings:
-                    preview_lines.append(f"  ⚠️  {warning}")
         
         else:
             preview_lines.extend([
@@ -406,17 +534,21 @@ class CommandExpander:
             ])
             for error in result.errors:
                 preview_lines.append(f"  ✗ {error}")
-            
-            if result.warnings:
-                preview_lines.extend(["", "Warnings:"])
-                for warning in result.warnings:
-                    preview_lines.append(f"  ⚠️  {warning}")
+        
+        if result.warnings:
+            preview_lines.extend(["", "Warnings:"])
+            for warning in result.warnings:
+                preview_lines.append(f"  ⚠️  {warning}")
         
         return "\n".join(preview_lines)
 
 
 # ===== Convenience functions =====
 
+# Expander reused by the convenience functions so its caches persist
+_default_expander = CommandExpander()
+
+
 def expand_template(
     template: Template,
     variables: Optional[Dict[str, Any]] = None
@@ -431,8 +563,7 @@ def expand_template(
     Returns:
         ExpansionResult
     """
-    expander = CommandExpander()
-    return expander.expand(template, variables)
+    return _default_expander.expand(template, variables)
 
 
 def preview_template(
@@ -449,6 +580,5 @@ def preview_template(
     Returns:
         Preview string
     """
-    expander = CommandExpander()
-    return expander.preview(template, variables)
+    return _default_expander.preview(template, variables)
 
@@ -4,14 +4,53 @@ Command History Tracking
 Logs expanded commands for auditing and reference.
 """
 
+import os
 import json
+import shutil
+import mmap
+import time
+import atexit
+from collections import Counter, defaultdict, deque
+from itertools import islice
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass, asdict
+from typing import List, Dict, Any, Optional, Iterator, Deque
+from dataclasses import dataclass
 
+from compat import DATACLASS_OPTIONS
 
-@dataclass
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
+# Files at least this large are tail-read through mmap by read_recent()
+_MMAP_THRESHOLD = 1 << 20
+
+# Default history file, and the single JSON document it replaced
+DEFAULT_HISTORY_FILE = Path.home() / '.tmx-history.jsonl'
+LEGACY_HISTORY_FILE = Path.home() / '.tmx-history.json'
+
+
+def _dumps_line(data: Dict[str, Any]) -> bytes:
+    """Serialize one history entry as a newline-terminated JSON line."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(
+            data, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS
+        )
+    return json.dumps(data, separators=(',', ':')).encode() + b'\n'
+
+
+def _loads(line: bytes) -> Any:
+    """Parse one JSON line."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(line)
+    return json.loads(line)
+
+
+@dataclass(**DATACLASS_OPTIONS)
 class HistoryEntry:
     """Single command history entry."""
     timestamp: str
@@ -24,7 +63,17 @@ class HistoryEntry:
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
-        return asdict(self)
+        # Spelled out: asdict() deep-copies every field, and nothing here
+        # needs copying just to be serialized
+        return {
+            'timestamp': self.timestamp,
+            'template_name': self.template_name,
+            'workflow': self.workflow,
+            'command': self.command,
+            'variables': self.variables,
+            'executed': self.executed,
+            'exit_code': self.exit_code,
+        }
 
 
 class CommandHistory:
@@ -32,54 +81,183 @@ class CommandHistory:
     Manages command execution history.
     
     Features:
-    - Persistent JSON storage
+    - Persistent append-only JSON Lines storage
     - Timestamp tracking
     - Execution status
     - Search and filter
+    
+    Each entry is one line of the history file, so saving appends only the
+    entries added since the last save. Writes are debounced: the first add
+    after an idle period is saved immediately, later ones within
+    ``flush_interval`` seconds are coalesced into the next save. Pending
+    entries are flushed by close(), or at interpreter exit if the history
+    is still open.
+    
+    Only the newest ``max_entries`` entries are kept; older ones are dropped
+    from memory as new ones arrive and from the file on the next load.
+    
+    History saved by earlier versions as one ``{"version", "history"}`` JSON
+    document is converted on load. The default file is seeded from
+    ``~/.tmx-history.json``; an explicit ``history_file`` in the old format
+    is rewritten in place after being copied to ``<name>.bak``.
     """
     
-    def __init__(self, history_file: Optional[Path] = None):
+    def __init__(
+        self,
+        history_file: Optional[Path] = None,
+        flush_interval: float = 1.0,
+        max_entries: int = 10_000
+    ):
         """
         Initialize command history.
         
         Args:
-            history_file: Path to history file (default: ~/.tmx-history.json)
+            history_file: Path to history file (default: ~/.tmx-history.jsonl)
+            flush_interval: Minimum seconds between saves triggered by add()
+            max_entries: Maximum number of entries to keep
         """
         if history_file is None:
-            self.history_file = Path.home() / '.tmx-history.json'
+            self.history_file = DEFAULT_HISTORY_FILE
+            self._legacy_file: Optional[Path] = LEGACY_HISTORY_FILE
         else:
             self.history_file = Path(history_file)
+            self._legacy_file = None
         
-        self.entries: List[HistoryEntry] = []
+        self.max_entries = max_entries
+        self.entries: Deque[HistoryEntry] = deque(maxlen=max_entries)
+        self._reset_stats()
+        self._flush_interval = flush_interval
+        self._last_save = float('-inf')
+        self._pending: List[HistoryEntry] = []
         self._load()
+        atexit.register(self.flush)
     
     def _load(self):
-        """Load history from file."""
+        """Load history from file, skipping unreadable lines."""
         if not self.history_file.exists():
+            if self._legacy_file is not None and self._legacy_file.exists():
+                self._migrate(self._legacy_file)
             return
         
         try:
-            with open(self.history_file, 'r') as f:
-                data = json.load(f)
-                self.entries = [
-                    HistoryEntry(**entry) for entry in data.get('history', [])
-                ]
-        except Exception:
+            with open(self.history_file, 'rb') as f:
+                # Only the newest max_entries lines are decoded
+                total = 0
+                lines: Deque[bytes] = deque(maxlen=self.max_entries)
+                for line in f:
+                    if line.strip():
+                        total += 1
+                        lines.append(line)
+        except OSError:
             # If loading fails, start fresh
-            self.entries = []
+            return
+        
+        for line in lines:
+            try:
+                entry = HistoryEntry(**_loads(line))
+            except (ValueError, TypeError):
+                continue
+            self.entries.append(entry)
+            self._record(entry)
+        
+        if total and not self.entries:
+            # Not one line is an entry: an old single-document history, or
+            # not a history file at all. Either way, never rewrite it empty.
+            self._migrate(self.history_file)
+            return
+        
+        # Drop trimmed and damaged lines (e.g. a write cut short) from the file
+        if len(self.entries) < total:
+            self._compact()
+    
+    def _migrate(self, legacy_file: Path):
+        """Convert a ``{"version", "history"}`` document into this file's entries."""
+        try:
+            data = _loads(legacy_file.read_bytes())
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or not isinstance(data.get('history'), list):
+            return
+        
+        for item in data['history'][-self.max_entries:]:
+            try:
+                entry = HistoryEntry(**item)
+            except TypeError:
+                continue
+            self.entries.append(entry)
+            self._record(entry)
+        
+        if legacy_file == self.history_file:
+            shutil.copy2(legacy_file, legacy_file.with_name(legacy_file.name + '.bak'))
+        self._compact()
+    
+    def _reset_stats(self):
+        """Zero the running statistics and lookup indexes."""
+        self._workflow_counts: Counter = Counter()
+        self._template_counts: Counter = Counter()
+        self._executed_count = 0
+        # Entries per template / workflow, oldest first
+        self._by_template: Dict[str, Deque[HistoryEntry]] = defaultdict(deque)
+        self._by_workflow: Dict[str, Deque[HistoryEntry]] = defaultdict(deque)
+    
+    def _record(self, entry: HistoryEntry):
+        """Fold one entry into the running statistics and lookup indexes."""
+        self._workflow_counts[entry.workflow] += 1
+        self._template_counts[entry.template_name] += 1
+        if entry.executed:
+            self._executed_count += 1
+        self._by_template[entry.template_name].append(entry)
+        self._by_workflow[entry.workflow].append(entry)
+    
+    def _forget_oldest(self):
+        """Remove the oldest entry from the running statistics and indexes."""
+        entry = self.entries[0]
+        for counts, index, key in (
+            (self._workflow_counts, self._by_workflow, entry.workflow),
+            (self._template_counts, self._by_template, entry.template_name),
+        ):
+            counts[key] -= 1
+            index[key].popleft()
+            if not counts[key]:
+                del counts[key]
+                del index[key]
+        if entry.executed:
+            self._executed_count -= 1
     
-    def _save(self):
-        """Save history to file."""
+    def _append(self):
+        """Append pending entries to the history file."""
         # Ensure parent directory exists
         self.history_file.parent.mkdir(parents=True, exist_ok=True)
         
-        data = {
-            'version': '1.0',
-            'history': [entry.to_dict() for entry in self.entries]
-        }
+        data = b''.join(_dumps_line(entry.to_dict()) for entry in self._pending)
+        with open(self.history_file, 'ab') as f:
+            f.write(data)
+        
+        self._pending = []
+        self._last_save = time.monotonic()
+    
+    def _compact(self):
+        """Rewrite the history file from the in-memory entries."""
+        self.history_file.parent.mkdir(parents=True, exist_ok=True)
+        
+        # Write a sibling file and swap it in so readers never see a partial file
+        tmp_file = self.history_file.with_suffix('.tmp')
+        with open(tmp_file, 'wb') as f:
+            f.write(b''.join(_dumps_line(entry.to_dict()) for entry in self.entries))
+        os.replace(tmp_file, self.history_file)
         
-        with open(self.history_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        self._pending = []
+        self._last_save = time.monotonic()
+    
+    def flush(self):
+        """Save any entries added since the last save."""
+        if self._pending:
+            self._append()
+    
+    def close(self):
+        """Save pending entries and stop saving them at interpreter exit."""
+        self.flush()
+        atexit.unregister(self.flush)
     
     def add(
         self,
@@ -111,8 +289,13 @@ class CommandHistory:
             exit_code=exit_code
         )
         
+        if len(self.entries) == self.max_entries:
+            self._forget_oldest()
         self.entries.append(entry)
-        self._save()
+        self._record(entry)
+        self._pending.append(entry)
+        if time.monotonic() - self._last_save >= self._flush_interval:
+            self._append()
     
     def get_recent(self, limit: int = 10) -> List[HistoryEntry]:
         """
@@ -124,13 +307,27 @@ class CommandHistory:
         Returns:
             List of recent entries (most recent first)
         """
-        return list(reversed(self.entries[-limit:]))
+        return list(islice(reversed(self.entries), max(limit, 0)))
+    
+    def get_recent_from_disk(self, limit: int = 10) -> List[HistoryEntry]:
+        """
+        Get recent entries by reading the tail of the history file.
+        
+        Args:
+            limit: Maximum number of entries to return
+        
+        Returns:
+            List of recent entries (most recent first)
+        """
+        self.flush()
+        return read_recent(self.history_file, limit)
     
     def search(
         self,
         template_name: Optional[str] = None,
         workflow: Optional[str] = None,
-        executed_only: bool = False
+        executed_only: bool = False,
+        limit: Optional[int] = None
     ) -> List[HistoryEntry]:
         """
         Search history with filters.
@@ -139,27 +336,56 @@ class CommandHistory:
             template_name: Filter by template name
             workflow: Filter by workflow
             executed_only: Only return executed commands
+            limit: Stop after this many matches (oldest first)
         
         Returns:
             Filtered list of entries
         """
-        results = self.entries
+        matches = self.iter_search(template_name, workflow, executed_only)
+        return list(islice(matches, limit))
+    
+    def iter_search(
+        self,
+        template_name: Optional[str] = None,
+        workflow: Optional[str] = None,
+        executed_only: bool = False
+    ) -> Iterator[HistoryEntry]:
+        """
+        Lazily yield entries matching the filters, in a single pass.
         
-        if template_name:
-            results = [e for e in results if e.template_name == template_name]
+        Args:
+            template_name: Filter by template name
+            workflow: Filter by workflow
+            executed_only: Only return executed commands
         
+        Yields:
+            Matching entries, oldest first
+        """
+        # Scan the smallest indexed candidate list rather than all entries
+        candidates = self.entries
+        if template_name:
+            candidates = self._by_template.get(template_name, ())
         if workflow:
-            results = [e for e in results if e.workflow == workflow]
-        
-        if executed_only:
-            results = [e for e in results if e.executed]
+            by_workflow = self._by_workflow.get(workflow, ())
+            if len(by_workflow) < len(candidates):
+                candidates = by_workflow
         
-        return results
+        for entry in candidates:
+            if template_name and entry.template_name != template_name:
+                continue
+            if workflow and entry.workflow != workflow:
+                continue
+            if executed_only and not entry.executed:
+                continue
+            yield entry
     
     def clear(self):
         """Clear all history."""
-        self.entries = []
-        self._save()
+        self.entries.clear()
+        self._reset_stats()
+        self._pending = []
+        if self.history_file.exists():
+            open(self.history_file, 'w').close()
     
     def get_stats(self) -> Dict[str, Any]:
         """
@@ -168,24 +394,72 @@ class CommandHistory:
         Returns:
             Dictionary of statistics
         """
-        total = len(self.entries)
-        executed = sum(1 for e in self.entries if e.executed)
-        
-        # Count by workflow
-        workflows = {}
-        for entry in self.entries:
-            workflows[entry.workflow] = workflows.get(entry.workflow, 0) + 1
-        
-        # Count by template
-        templates = {}
-        for entry in self.entries:
-            templates[entry.template_name] = templates.get(entry.template_name, 0) + 1
+        most_used = self._template_counts.most_common(1)
         
         return {
-            'total_commands': total,
-            'executed_commands': executed,
-            'by_workflow': workflows,
-            'by_template': templates,
-            'most_used_template': max(templates.items(), key=lambda x: x[1])[0] if templates else None
+            'total_commands': len(self.entries),
+            'executed_commands': self._executed_count,
+            'by_workflow': dict(self._workflow_counts),
+            'by_template': dict(self._template_counts),
+            'most_used_template': most_used[0][0] if most_used else None
         }
 
+
+# ===== Convenience functions =====
+
+def read_recent(history_file: Optional[Path] = None, limit: int = 10) -> List[HistoryEntry]:
+    """
+    Read the newest entries of a history file without loading all of it.
+    
+    Large files are memory-mapped and scanned backwards from the end, so
+    the cost depends on ``limit`` rather than on the file size. Damaged
+    lines are skipped.
+    
+    Args:
+        history_file: Path to history file (default: ~/.tmx-history.jsonl)
+        limit: Maximum number of entries to return
+    
+    Returns:
+        List of recent entries (most recent first)
+    """
+    if history_file is None:
+        history_file = DEFAULT_HISTORY_FILE
+    
+    if limit <= 0:
+        return []
+    
+    try:
+        f = open(history_file, 'rb')
+    except FileNotFoundError:
+        return []
+    
+    with f:
+        size = os.fstat(f.fileno()).st_size
+        if size < _MMAP_THRESHOLD:
+            return _decode_newest(reversed(f.read().splitlines()), limit)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            return _decode_newest(_reversed_lines(buf, size), limit)
+
+
+def _decode_newest(lines: Iterator[bytes], limit: int) -> List[HistoryEntry]:
+    """Decode up to limit entries from lines given newest first."""
+    entries: List[HistoryEntry] = []
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            entries.append(HistoryEntry(**_loads(line)))
+        except (ValueError, TypeError):
+            continue
+        if len(entries) == limit:
+            break
+    return entries
+
+
+def _reversed_lines(buf: mmap.mmap, size: int) -> Iterator[bytes]:
+    """Yield the lines of a mapped file from last to first."""
+    end = size
+    while end > 0:
+        start = buf.rfind(b'\n', 0, end) + 1
+        yield buf[start:end]
+        end = start - 1
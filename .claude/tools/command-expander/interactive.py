@@ -6,9 +6,15 @@ Note: Uses built-in input() for now. Can be enhanced with prompt_toolkit later.
 """
 
 from typing import Dict, Any, Optional, List, Tuple
-import re
 
-from template_loader import VariableSpec
+from template_loader import VariableSpec, parse_bool
+
+# Parser and validation message per non-string variable type
+_TYPE_PARSERS = {
+    'integer': (int, 'Must be a valid integer'),
+    'float': (float, 'Must be a valid number'),
+    'boolean': (parse_bool, 'Must be true/false'),
+}
 
 
 def validate_input(text: str, var_spec: VariableSpec) -> Tuple[bool, Optional[str]]:
@@ -31,35 +37,64 @@ def validate_input(text: str, var_spec: VariableSpec) -> Tuple[bool, Optional[st
         return True, None  # Optional variable, empty is ok
     
     # Type validation
-    if var_spec.type == 'integer':
-        try:
-            int(text)
-        except ValueError:
-            return False, 'Must be a valid integer'
-    
-    elif var_spec.type == 'float':
+    type_parser = _TYPE_PARSERS.get(var_spec.type)
+    if type_parser is not None:
+        parse, message = type_parser
         try:
-            float(text)
+            parse(text)
         except ValueError:
-            return False, 'Must be a valid number'
-    
-    elif var_spec.type == 'boolean':
-        if text.lower() not in ['true', 'false', 'yes', 'no', '1', '0', 'on', 'off']:
-            return False, 'Must be true/false'
+            return False, message
     
     # Pattern validation
     if var_spec.pattern:
-        if not re.match(var_spec.pattern, text):
+        if not var_spec.compiled_pattern().match(text):
             return False, f'Must match pattern: {var_spec.pattern}'
     
     # Options validation
     if var_spec.options:
-        if text not in [str(opt) for opt in var_spec.options]:
+        if text not in var_spec.option_set():
             return False, f'Must be one of: {", ".join(map(str, var_spec.options))}'
     
     return True, None
 
 
+def _build_prompt(var_spec: VariableSpec) -> str:
+    """
+    Build the input prompt for a variable in one join.
+    
+    Args:
+        var_spec: Variable specification
+    
+    Returns:
+        Prompt text, ending where the user types
+    """
+    parts = ["\n", var_spec.name]
+    if var_spec.description:
+        parts += [" - ", var_spec.description]
+    
+    # Add constraints info
+    constraints = []
+    if var_spec.required:
+        constraints.append("required")
+    if var_spec.options:
+        constraints.append(f"options: {', '.join(map(str, var_spec.options))}")
+    if var_spec.pattern:
+        constraints.append(f"pattern: {var_spec.pattern}")
+    if var_spec.min is not None or var_spec.max is not None:
+        constraints.append(f"range: {var_spec.min or '∞'}-{var_spec.max or '∞'}")
+    
+    if constraints:
+        parts += [" (", ", ".join(constraints), ")"]
+    
+    # Default value
+    if var_spec.default is not None:
+        parts += ["\n  [default: ", str(var_spec.default), "]: "]
+    else:
+        parts.append(": ")
+    
+    return "".join(parts)
+
+
 def prompt_for_variables(
     variables: List[VariableSpec],
     existing_values: Optional[Dict[str, Any]] = None
@@ -95,33 +130,7 @@ def prompt_for_variables(
             if skip not in ['y', 'yes']:
                 continue
         
-        # Build prompt message
-        prompt_msg = f"\n{var_spec.name}"
-        if var_spec.description:
-            prompt_msg += f" - {var_spec.description}"
-        
-        # Add constraints info
-        constraints = []
-        if var_spec.required:
-            constraints.append("required")
-        if var_spec.options:
-            constraints.append(f"options: {', '.join(map(str, var_spec.options))}")
-        if var_spec.pattern:
-            constraints.append(f"pattern: {var_spec.pattern}")
-        if var_spec.min is not None or var_spec.max is not None:
-            range_str = f"range: {var_spec.min or '∞'}-{var_spec.max or '∞'}"
-            constraints.append(range_str)
-        
-        if constraints:
-            prompt_msg += f" ({', '.join(constraints)})"
-        
-        # Default value
-        default_value = ""
-        if var_spec.default is not None:
-            default_value = str(var_spec.default)
-            prompt_msg += f"\n  [default: {default_value}]: "
-        else:
-            prompt_msg += ": "
+        prompt_msg = _build_prompt(var_spec)
         
         # Prompt loop with validation
         while True:
@@ -145,12 +154,9 @@ def prompt_for_variables(
                     continue
                 
                 # Type conversion
-                if var_spec.type == 'integer':
-                    value = int(value)
-                elif var_spec.type == 'float':
-                    value = float(value)
-                elif var_spec.type == 'boolean':
-                    value = value.lower() in ['true', 'yes', '1', 'on']
+                type_parser = _TYPE_PARSERS.get(var_spec.type)
+                if type_parser is not None:
+                    value = type_parser[0](value)
                 
                 result[var_spec.name] = value
                 break
@@ -5,7 +5,8 @@ Validates commands against dangerous patterns and denylist.
 """
 
 import re
-from typing import List, Tuple, Optional
+from functools import lru_cache
+from typing import List, Tuple, Optional, Pattern
 
 
 # Dangerous command patterns (regex)
@@ -23,7 +24,8 @@ DANGEROUS_PATTERNS = [
     r'kill\s+-9\s+1',  # Kill init process
 ]
 
-# Dangerous keywords (require confirmation)
+# Dangerous keywords (require confirmation). Plain `in` checks: for a list
+# this short, str.__contains__'s C search beats a multi-pattern automaton.
 DANGEROUS_KEYWORDS = [
     'DROP DATABASE',
     'DROP TABLE',
@@ -37,6 +39,66 @@ DANGEROUS_KEYWORDS = [
     'sudo dd',
 ]
 
+# Built-in patterns, compiled once for every checker. They are searched one
+# by one rather than as a single alternation: the re engine tries every
+# branch at every position, so a joined pattern loses each pattern's
+# literal-prefix scan and is slower on all but the shortest commands.
+_COMPILED_PATTERNS = [re.compile(p, re.IGNORECASE) for p in DANGEROUS_PATTERNS]
+
+_SUDO_VARIABLE_RE = re.compile(r'sudo\s+\$')
+_RM_WILDCARD_RE = re.compile(r'rm\s+.*\*')
+
+
+@lru_cache(maxsize=512)
+def _check_impl(
+    command: str,
+    patterns: Tuple[Pattern, ...],
+    keywords: Tuple[str, ...]
+) -> Tuple[bool, Tuple[str, ...], Tuple[str, ...]]:
+    """
+    Check a command against a pattern and keyword configuration.
+    
+    Pure, so results are memoized: re-checking the same expanded command
+    (retries, interactive loops) is a dictionary lookup.
+    
+    Returns:
+        Tuple of (is_safe, errors, warnings)
+    """
+    errors = []
+    warnings = []
+    
+    # Check against dangerous patterns
+    for pattern in patterns:
+        if pattern.search(command):
+            errors.append(
+                f"Command matches dangerous pattern: {pattern.pattern}"
+            )
+    
+    # Check for dangerous keywords
+    for keyword in keywords:
+        if keyword in command:
+            warnings.append(
+                f"Command contains potentially dangerous keyword: {keyword}"
+            )
+    
+    # Additional checks
+    
+    # Check for sudo without specific command
+    if _SUDO_VARIABLE_RE.search(command):
+        warnings.append("Using sudo with variable expansion - ensure variables are trusted")
+    
+    # Check for wildcard deletions
+    if _RM_WILDCARD_RE.search(command):
+        warnings.append("Using wildcard with rm - double-check the path")
+    
+    # Check for force flags with critical operations
+    if '--force' in command and any(op in command for op in ['git push', 'npm publish', 'docker rmi']):
+        warnings.append("Using --force with critical operation")
+    
+    is_safe = len(errors) == 0
+    
+    return is_safe, tuple(errors), tuple(warnings)
+
 
 class CommandSafety:
     """
@@ -57,10 +119,13 @@ class CommandSafety:
             custom_patterns: Additional dangerous patterns to check
         """
         self.patterns = DANGEROUS_PATTERNS.copy()
-        if custom_patterns:
-            self.patterns.extend(custom_patterns)
-        
         self.keywords = DANGEROUS_KEYWORDS.copy()
+        # Compiled patterns and keywords as tuples, built once per change
+        # rather than per check since they form the _check_impl cache key
+        self._compiled = tuple(_COMPILED_PATTERNS)
+        self._keywords = tuple(self.keywords)
+        for pattern in custom_patterns or ():
+            self.add_pattern(pattern)
     
     def check_command(self, command: str) -> Tuple[bool, List[str], List[str]]:
         """
@@ -72,48 +137,27 @@ class CommandSafety:
         Returns:
             Tuple of (is_safe, errors, warnings)
         """
-        errors = []
-        warnings = []
-        
-        # Check against dangerous patterns
-        for pattern in self.patterns:
-            if re.search(pattern, command, re.IGNORECASE):
-                errors.append(
-                    f"Command matches dangerous pattern: {pattern}"
-                )
-        
-        # Check for dangerous keywords
-        for keyword in self.keywords:
-            if keyword in command:
-                warnings.append(
-                    f"Command contains potentially dangerous keyword: {keyword}"
-                )
-        
-        # Additional checks
-        
-        # Check for sudo without specific command
-        if re.search(r'sudo\s+\$', command):
-            warnings.append("Using sudo with variable expansion - ensure variables are trusted")
-        
-        # Check for wildcard deletions
-        if re.search(r'rm\s+.*\*', command):
-            warnings.append("Using wildcard with rm - double-check the path")
-        
-        # Check for force flags with critical operations
-        if '--force' in command and any(op in command for op in ['git push', 'npm publish', 'docker rmi']):
-            warnings.append("Using --force with critical operation")
-        
-        is_safe = len(errors) == 0
-        
-        return is_safe, errors, warnings
+        # Catch up with lists extended directly rather than via add_*()
+        if len(self._compiled) != len(self.patterns) or len(self._keywords) != len(self.keywords):
+            self._rebuild()
+        is_safe, errors, warnings = _check_impl(command, self._compiled, self._keywords)
+        return is_safe, list(errors), list(warnings)
     
     def add_pattern(self, pattern: str):
         """Add a custom dangerous pattern."""
+        compiled = re.compile(pattern, re.IGNORECASE)
         self.patterns.append(pattern)
+        self._compiled += (compiled,)
     
     def add_keyword(self, keyword: str):
         """Add a custom dangerous keyword."""
         self.keywords.append(keyword)
+        self._keywords += (keyword,)
+    
+    def _rebuild(self):
+        """Rebuild the compiled pattern and keyword tuples from the lists."""
+        self._compiled = tuple(re.compile(p, re.IGNORECASE) for p in self.patterns)
+        self._keywords = tuple(self.keywords)
     
     def is_dangerous_operation(self, command: str) -> bool:
         """
@@ -131,6 +175,10 @@ class CommandSafety:
 
 # ===== Convenience functions =====
 
+# Shared checker with the default configuration
+_DEFAULT_CHECKER = CommandSafety()
+
+
 def check_command_safety(command: str) -> Tuple[bool, List[str], List[str]]:
     """
     Check command safety (convenience function).
@@ -141,6 +189,5 @@ def check_command_safety(command: str) -> Tuple[bool, List[str], List[str]]:
     Returns:
         Tuple of (is_safe, errors, warnings)
     """
-    checker = CommandSafety()
-    return checker.check_command(command)
+    return _DEFAULT_CHECKER.check_command(command)
 
@@ -4,16 +4,117 @@ Template Loader
 Loads and validates command templates from YAML files.
 """
 
+import re
+import sys
 import yaml
 import logging
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, field
 
+from compat import DATACLASS_OPTIONS
+
+# libyaml's C loader parses several times faster when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
 logger = logging.getLogger(__name__)
 
+# Top-level ``workflow: name`` line of a TemplateLoader file. Only values
+# whose whole scalar is matched (a simple quoted string, or a plain name of
+# word characters, dots, dashes and inner spaces) are captured; anything else
+# is left to the YAML parser so the index never disagrees with it
+_WORKFLOW_LINE_RE = re.compile(
+    r'^workflow:[ \t]*'
+    r'(?:"([^"\\\n]*)"|\'([^\'\n]*)\'|([A-Za-z_][\w.\-]*(?:[ \t]+[\w.\-]+)*))'
+    r'[ \t]*(?:(?<=[ \t])#.*)?$',
+    re.MULTILINE
+)
+
+# Plain scalars YAML resolves to something other than a string
+_NON_STRING_SCALARS = frozenset((
+    'true', 'false', 'yes', 'no', 'on', 'off', 'null', 'y', 'n'
+))
+
+# Accepted string spellings of boolean variable values (compared lowercased)
+_TRUE_VALUES = frozenset(('true', 'yes', '1', 'on'))
+_FALSE_VALUES = frozenset(('false', 'no', '0', 'off'))
+
+
+def parse_bool(text: str) -> bool:
+    """
+    Parse a boolean variable value such as "yes" or "off".
+    
+    Raises:
+        ValueError: If the text is not a recognised spelling
+    """
+    lowered = text.lower()
+    if lowered in _TRUE_VALUES:
+        return True
+    if lowered in _FALSE_VALUES:
+        return False
+    raise ValueError(f"Not a boolean: {text!r}")
+
+
+def _intern(value: Any) -> Any:
+    """Intern strings repeated across templates; pass other values through."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _indexed_workflow(match: Optional[re.Match]) -> Optional[str]:
+    """Workflow name from a _WORKFLOW_LINE_RE match, or None to parse the file instead."""
+    if match is None:
+        return None
+    double_quoted, single_quoted, plain = match.groups()
+    if plain is not None:
+        return None if plain.lower() in _NON_STRING_SCALARS else plain
+    name = double_quoted if double_quoted is not None else single_quoted
+    # An empty name is rejected by load_file, which logs why
+    return name or None
+
+
+@lru_cache(maxsize=256)
+def compile_pattern(pattern: str) -> re.Pattern:
+    """
+    Compile a variable pattern, sharing the result across specs.
+    
+    Bounded so specs built on the fly (not just loaded from YAML) cannot
+    grow the pool without limit.
+    
+    Raises:
+        re.error: If the pattern is not a valid regex
+    """
+    return re.compile(pattern)
+
+
+# A bare ``{{ name }}`` or ``{{ name | filter }}`` placeholder
+_VAR_RE = re.compile(r'\{\{\s*([A-Za-z_]\w*)(?:\s*\|\s*[A-Za-z_]\w*)?\s*\}\}')
+
+
+# Leading identifier of any ``{{ ... }}`` expression
+_JINJA_VAR_RE = re.compile(r'\{\{\s*(\w+)')
+
+
+def extract_vars(command: str) -> List[str]:
+    """
+    List the variables referenced by simple placeholders in a command.
+    
+    Only ``{{ name }}`` and ``{{ name | filter }}`` forms are recognised;
+    names used solely inside Jinja2 tags or expressions are not reported.
+    
+    Args:
+        command: Jinja2 command template string
+    
+    Returns:
+        Variable names in order of first appearance, without duplicates
+    """
+    return list(dict.fromkeys(_VAR_RE.findall(command)))
+
 
-@dataclass
+@dataclass(**DATACLASS_OPTIONS)
 class VariableSpec:
     """Specification for a template variable."""
     name: str
@@ -25,9 +126,58 @@ class VariableSpec:
     options: Optional[List[str]] = None
     min: Optional[int] = None
     max: Optional[int] = None
+    # Caches filled in by __post_init__ or on first use. The class is
+    # slotted but not frozen: it carries list fields, so it could not be
+    # hashed anyway, and freezing would only turn these writes into
+    # object.__setattr__ calls.
+    _pattern_re: Optional[re.Pattern] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _option_set: Optional[frozenset] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    
+    def __post_init__(self):
+        if self.options:
+            self._option_set = frozenset(str(opt) for opt in self.options)
+        # Compile up front so expansion never pays for it; an invalid
+        # pattern is left for compiled_pattern() to report when used
+        if self.pattern:
+            try:
+                self._pattern_re = compile_pattern(self.pattern)
+            except re.error:
+                pass
+    
+    def compiled_pattern(self) -> Optional[re.Pattern]:
+        """
+        Get the compiled ``pattern``, compiling it on first use.
+        
+        Returns:
+            Compiled regex, or None if the spec has no pattern
+        
+        Raises:
+            re.error: If the pattern is not a valid regex
+        """
+        if self._pattern_re is None and self.pattern:
+            self._pattern_re = compile_pattern(self.pattern)
+        return self._pattern_re
+    
+    def option_set(self) -> frozenset:
+        """
+        Get ``options`` as strings for membership tests.
+        
+        Built at construction; error messages list ``options`` itself so
+        they keep the declared order.
+        
+        Returns:
+            Frozenset of the string form of each option
+        """
+        if self._option_set is None:
+            self._option_set = frozenset(str(opt) for opt in self.options or ())
+        return self._option_set
 
 
-@dataclass
+@dataclass(**DATACLASS_OPTIONS)
 class Template:
     """Command template definition."""
     name: str
@@ -38,14 +188,51 @@ class Template:
     aliases: List[str] = field(default_factory=list)
     examples: List[str] = field(default_factory=list)
     safety: Dict[str, bool] = field(default_factory=lambda: {'dangerous': False, 'confirm': False})
+    _placeholders: Optional[List[str]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    
+    def placeholders(self) -> List[str]:
+        """
+        Get the variables referenced in ``command``, extracted on first use.
+        
+        Returns:
+            Variable names as returned by extract_vars
+        """
+        if self._placeholders is None:
+            self._placeholders = extract_vars(self.command)
+        return self._placeholders
 
 
-@dataclass
+@dataclass(**DATACLASS_OPTIONS)
 class Workflow:
     """Workflow category containing templates."""
     name: str
     description: str
     templates: List[Template] = field(default_factory=list)
+    _index: Optional[tuple] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    
+    def template_index(self) -> tuple:
+        """
+        Get name and alias lookup tables, built on first use.
+        
+        The tables are rebuilt if templates are added. The first template to
+        claim a name or alias wins, matching a linear scan of ``templates``.
+        
+        Returns:
+            Tuple of (templates by name, templates by alias)
+        """
+        if self._index is None or self._index[0] != len(self.templates):
+            by_name: Dict[str, Template] = {}
+            by_alias: Dict[str, Template] = {}
+            for template in self.templates:
+                by_name.setdefault(template.name, template)
+                for alias in template.aliases:
+                    by_alias.setdefault(alias, template)
+            self._index = (len(self.templates), by_name, by_alias)
+        return self._index[1], self._index[2]
 
 
 class TemplateLoader:
@@ -58,6 +245,9 @@ class TemplateLoader:
     - Support for aliases
     - Workflow organization
     - Variable specifications
+    
+    load_all() only indexes files by their ``workflow:`` line; each file is
+    parsed the first time a lookup needs it.
     """
     
     def __init__(self, templates_dir: Optional[Path] = None):
@@ -75,9 +265,11 @@ class TemplateLoader:
         self.workflows: Dict[str, Workflow] = {}
         self.templates: Dict[str, Template] = {}
         self.aliases: Dict[str, str] = {}
+        # Workflow name -> template files not parsed yet
+        self._file_index: Dict[str, List[Path]] = {}
     
     def load_all(self):
-        """Load all template files from templates directory."""
+        """Index all template files in the templates directory."""
         if not self.templates_dir.exists():
             logger.error(f"Templates directory not found: {self.templates_dir}")
             return
@@ -85,12 +277,44 @@ class TemplateLoader:
         yaml_files = list(self.templates_dir.glob('*.yaml')) + list(self.templates_dir.glob('*.yml'))
         
         for yaml_file in yaml_files:
+            try:
+                match = _WORKFLOW_LINE_RE.search(yaml_file.read_text())
+            except OSError as e:
+                logger.error(f"Error loading {yaml_file}: {e}")
+                continue
+            
+            workflow = _indexed_workflow(match)
+            if workflow is not None:
+                self._file_index.setdefault(workflow, []).append(yaml_file)
+            else:
+                # No simple workflow line to index by; parse it now
+                self._load_files([yaml_file])
+        
+        logger.info(f"Indexed {len(yaml_files)} template files")
+    
+    def _load_files(self, paths: List[Path]):
+        """Parse template files, logging (not raising) load errors."""
+        # Parsed sequentially: PyYAML holds the GIL while parsing (libyaml
+        # included), so a thread pool adds overhead without overlapping work
+        for yaml_file in paths:
             try:
                 self.load_file(yaml_file)
             except Exception as e:
                 logger.error(f"Error loading {yaml_file}: {e}")
-        
-        logger.info(f"Loaded {len(self.templates)} templates from {len(self.workflows)} workflows")
+    
+    def _load_workflow_files(self, workflow: Optional[str] = None):
+        """Parse the unparsed files of one workflow, or of all workflows."""
+        if workflow is None:
+            pending = [path for paths in self._file_index.values() for path in paths]
+            self._file_index.clear()
+        elif workflow in self._file_index:
+            pending = self._file_index.pop(workflow)
+        elif workflow not in self.workflows:
+            # Not an indexed name; it may still be declared by an unparsed file
+            return self._load_workflow_files()
+        else:
+            pending = []
+        self._load_files(pending)
     
     def load_file(self, file_path: Path):
         """
@@ -100,14 +324,14 @@ class TemplateLoader:
             file_path: Path to YAML file
         """
         with open(file_path, 'r') as f:
-            data = yaml.safe_load(f)
+            data = yaml.load(f, Loader=SafeLoader)
         
         if not data:
             logger.warning(f"Empty YAML file: {file_path}")
             return
         
         # Extract workflow info
-        workflow_name = data.get('workflow')
+        workflow_name = _intern(data.get('workflow'))
         if not workflow_name:
             logger.error(f"Missing 'workflow' field in {file_path}")
             return
@@ -129,7 +353,7 @@ class TemplateLoader:
             template = self._parse_template(template_name, workflow_name, template_data)
             
             # Add to workflow
-            workflow.templates[template_name] = template
+            workflow.templates.append(template)
             
             # Add to global templates
             full_name = f"{workflow_name}.{template_name}"
@@ -145,21 +369,22 @@ class TemplateLoader:
     def _parse_template(self, name: str, workflow: str, data: Dict) -> Template:
         """Parse template definition from YAML data."""
         # Parse variables
-        variables = {}
+        variables = []
         variables_data = data.get('variables', {})
         
         for var_name, var_data in variables_data.items():
             if isinstance(var_data, dict):
-                variables[var_name] = VariableSpec(
+                variables.append(VariableSpec(
+                    name=var_name,
                     description=var_data.get('description', ''),
                     required=var_data.get('required', False),
-                    type=var_data.get('type', 'string'),
+                    type=_intern(var_data.get('type', 'string')),
                     default=var_data.get('default'),
                     pattern=var_data.get('pattern'),
                     options=var_data.get('options'),
                     min=var_data.get('min'),
                     max=var_data.get('max')
-                )
+                ))
         
         return Template(
             name=name,
@@ -167,10 +392,12 @@ class TemplateLoader:
             description=data.get('description', ''),
             command=data.get('command', ''),
             variables=variables,
-            aliases=data.get('aliases', []),
+            aliases=[_intern(alias) for alias in data.get('aliases', [])],
             examples=data.get('examples', []),
-            dangerous=data.get('dangerous', False),
-            confirm=data.get('confirm', False)
+            safety={
+                'dangerous': bool(data.get('dangerous', False)),
+                'confirm': bool(data.get('confirm', False))
+            }
         )
     
     def get_template(self, name: str) -> Optional[Template]:
@@ -183,6 +410,20 @@ class TemplateLoader:
         Returns:
             Template instance or None
         """
+        template = self._lookup(name)
+        if template is None and self._file_index:
+            # A qualified "workflow.template" name needs only that workflow
+            workflow, sep, _ = name.partition('.')
+            if sep and workflow in self._file_index:
+                self._load_workflow_files(workflow)
+                template = self._lookup(name)
+            if template is None:
+                self._load_workflow_files()
+                template = self._lookup(name)
+        return template
+    
+    def _lookup(self, name: str) -> Optional[Template]:
+        """Find a template among the files parsed so far."""
         # Check direct name
         if name in self.templates:
             return self.templates[name]
@@ -204,23 +445,18 @@ class TemplateLoader:
         Returns:
             List of templates
         """
+        self._load_workflow_files(workflow or None)
+        
         if workflow:
             wf = self.workflows.get(workflow)
-            return list(wf.templates.values()) if wf else []
+            return list(wf.templates) if wf else []
         
-        # Return all templates (deduplicated)
-        seen = set()
-        templates = []
-        for template in self.templates.values():
-            full_name = f"{template.workflow}.{template.name}"
-            if full_name not in seen:
-                seen.add(full_name)
-                templates.append(template)
-        
-        return templates
+        # Return all templates; each is registered under several keys
+        return [template for wf in self.workflows.values() for template in wf.templates]
     
     def list_workflows(self) -> List[Workflow]:
         """List all workflows."""
+        self._load_workflow_files()
         return list(self.workflows.values())
     
     def validate_template(self, template: Template) -> List[str]:
@@ -242,14 +478,17 @@ class TemplateLoader:
             errors.append("Template command is required")
         
         # Validate command contains required variables
-        for var_name, var_spec in template.variables.items():
-            if var_spec.required and f"{{{{ {var_name}" not in template.command:
-                errors.append(f"Required variable '{var_name}' not used in command")
+        used = set(_JINJA_VAR_RE.findall(template.command))
+        errors.extend(
+            f"Required variable '{var_spec.name}' not used in command"
+            for var_spec in template.variables
+            if var_spec.required and var_spec.name not in used
+        )
         
         # Validate variable types
-        for var_name, var_spec in template.variables.items():
+        for var_spec in template.variables:
             if var_spec.type not in ['string', 'integer', 'boolean', 'float']:
-                errors.append(f"Invalid type '{var_spec.type}' for variable '{var_name}'")
+                errors.append(f"Invalid type '{var_spec.type}' for variable '{var_spec.name}'")
         
         return errors
 
@@ -275,13 +514,13 @@ def load_workflow(file_path: str) -> Workflow:
         raise FileNotFoundError(f"Template file not found: {file_path}")
     
     with open(path, 'r') as f:
-        data = yaml.safe_load(f)
+        data = yaml.load(f, Loader=SafeLoader)
     
     if not data:
         raise ValueError("Empty YAML file")
     
     # Extract workflow metadata - try 'name' first, fall back to 'workflow'
-    workflow_name = data.get('name', data.get('workflow', ''))
+    workflow_name = _intern(data.get('name', data.get('workflow', '')))
     workflow_desc = data.get('description', '')
     
     # Parse templates - handle both dict and list formats
@@ -316,7 +555,7 @@ def load_workflow(file_path: str) -> Workflow:
                 name=var_data.get('name', ''),
                 description=var_data.get('description', ''),
                 required=var_data.get('required', False),
-                type=var_data.get('type', 'string'),
+                type=_intern(var_data.get('type', 'string')),
                 default=var_data.get('default'),
                 pattern=var_data.get('pattern'),
                 options=var_data.get('options'),
@@ -345,17 +584,20 @@ def load_workflow(file_path: str) -> Workflow:
             description=template_data.get('description', ''),
             workflow=workflow_name,
             variables=variables,
-            aliases=template_data.get('aliases', []),
+            aliases=[_intern(alias) for alias in template_data.get('aliases', [])],
             examples=template_data.get('examples', []),
             safety=safety
         )
         templates_list.append(template)
     
-    return Workflow(
+    workflow = Workflow(
         name=workflow_name,
         description=workflow_desc,
         templates=templates_list
     )
+    # Likewise build the name/alias index so lookups start warm
+    workflow.template_index()
+    return workflow
 
 
 def load_templates(directory: str) -> List[Workflow]:
@@ -395,10 +637,8 @@ def get_template_by_name(workflow: Workflow, name: str) -> Optional[Template]:
     Returns:
         Template instance or None
     """
-    for template in workflow.templates:
-        if template.name == name:
-            return template
-    return None
+    by_name, _ = workflow.template_index()
+    return by_name.get(name)
 
 
 def get_template_by_alias(workflow: Workflow, alias: str) -> Optional[Template]:
@@ -412,10 +652,8 @@ def get_template_by_alias(workflow: Workflow, alias: str) -> Optional[Template]:
     Returns:
         Template instance or None
     """
-    for template in workflow.templates:
-        if alias in template.aliases:
-            return template
-    return None
+    _, by_alias = workflow.template_index()
+    return by_alias.get(alias)
 
 
 def validate_template(template: Template) -> tuple[bool, List[str]]:
@@ -443,12 +681,13 @@ def validate_template(template: Template) -> tuple[bool, List[str]]:
         if var.type not in valid_types:
             errors.append(f"Invalid type '{var.type}' for variable '{var.name}'")
     
-    # Check required variables are used in command
-    for var in template.variables:
-        if var.required:
-            # Check for Jinja2-style variable reference
-            if f"{{{{ {var.name}" not in template.command and f"{{{{{var.name}" not in template.command:
-                errors.append(f"Required variable '{var.name}' not found in command")
+    # Check required variables are used in command (Jinja2-style reference)
+    used = set(_JINJA_VAR_RE.findall(template.command))
+    errors.extend(
+        f"Required variable '{var.name}' not found in command"
+        for var in template.variables
+        if var.required and var.name not in used
+    )
     
     return (len(errors) == 0, errors)
 
@@ -26,14 +26,21 @@ from expander import (
     CommandExpander,
     ExpansionResult,
     expand_template,
-    preview_template
+    preview_template,
+    clear_compile_cache
 )
 from template_loader import Template, VariableSpec
 
 
 # ===== Fixtures =====
 
-@pytest.fixture
+@pytest.fixture(scope="session")
+def expander():
+    """Expander shared by every test (it holds no per-expansion state)"""
+    return CommandExpander()
+
+
+@pytest.fixture(scope="module")
 def simple_template():
     """Simple template with one required variable"""
     return Template(
@@ -51,7 +58,7 @@ def simple_template():
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def template_with_defaults():
     """Template with default values"""
     return Template(
@@ -77,7 +84,7 @@ def template_with_defaults():
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def template_with_options():
     """Template with option constraints"""
     return Template(
@@ -104,7 +111,7 @@ def template_with_options():
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def template_with_pattern():
     """Template with regex pattern validation"""
     return Template(
@@ -123,7 +130,7 @@ def template_with_pattern():
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def template_with_range():
     """Template with min/max validation"""
     return Template(
@@ -151,7 +158,7 @@ def template_with_range():
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def complex_template():
     """Complex template with multiple variable types"""
     return Template(
@@ -193,51 +200,52 @@ def complex_template():
     )
 
 
+def _contains_all(text, *needles):
+    """Check that every needle appears in text, ignoring case"""
+    lowered = text.lower()
+    return all(needle in lowered for needle in needles)
+
+
 # ===== Basic Expansion Tests =====
 
-def test_simple_expansion(simple_template):
+def test_simple_expansion(expander, simple_template):
     """Test basic template expansion with required variable"""
-    expander = CommandExpander()
     result = expander.expand(simple_template, {"message": "Hello World"})
     
-    assert result.success == True
+    assert result.success
     assert result.command == "echo 'Hello World'"
     assert result.errors == []
     assert result.variables_used == {"message": "Hello World"}
 
 
-def test_expansion_missing_required_variable(simple_template):
+def test_expansion_missing_required_variable(expander, simple_template):
     """Test expansion fails when required variable is missing"""
-    expander = CommandExpander()
     result = expander.expand(simple_template, {})
     
-    assert result.success == False
+    assert not result.success
     assert len(result.errors) > 0
-    assert "message" in result.errors[0].lower()
-    assert "required" in result.errors[0].lower()
+    assert _contains_all(result.errors[0], "message", "required")
 
 
-def test_expansion_with_defaults(template_with_defaults):
+def test_expansion_with_defaults(expander, template_with_defaults):
     """Test expansion uses default values when variables not provided"""
-    expander = CommandExpander()
     result = expander.expand(template_with_defaults, {})
     
-    assert result.success == True
+    assert result.success
     assert result.command == "python -m http.server 8080 --bind localhost"
     assert result.variables_used["port"] == 8080
     assert result.variables_used["host"] == "localhost"
     assert len(result.warnings) == 2  # Both used defaults
 
 
-def test_expansion_override_defaults(template_with_defaults):
+def test_expansion_override_defaults(expander, template_with_defaults):
     """Test provided values override defaults"""
-    expander = CommandExpander()
     result = expander.expand(
         template_with_defaults,
         {"port": 3000, "host": "0.0.0.0"}
     )
     
-    assert result.success == True
+    assert result.success
     assert result.command == "python -m http.server 3000 --bind 0.0.0.0"
     assert result.variables_used["port"] == 3000
     assert result.variables_used["host"] == "0.0.0.0"
@@ -245,257 +253,187 @@ def test_expansion_override_defaults(template_with_defaults):
 
 # ===== Type Validation Tests =====
 
-def test_string_type_conversion():
+@pytest.fixture(scope="module")
+def typed_templates():
+    """One "echo {{ value }}" template per variable type"""
+    return {
+        var_type: Template(
+            name="test",
+            command="echo {{ value }}",
+            description="Test",
+            variables=[VariableSpec(name="value", type=var_type, required=True, description="")]
+        )
+        for var_type in ("string", "integer", "float", "boolean")
+    }
+
+
+def _check_conversion(result, ok, expected):
+    """Assert a converted value on success, or an error substring on failure"""
+    assert result.success == ok
+    if ok:
+        assert result.variables_used["value"] == expected
+    elif expected:
+        assert expected in result.errors[0].lower()
+
+
+@pytest.mark.parametrize("value,ok,expected", [
+    ("hello", True, "hello"),   # String stays string
+    (123, True, "123"),         # Number converts to string
+])
+def test_string_type_conversion(expander, typed_templates, value, ok, expected):
     """Test string type conversion"""
-    template = Template(
-        name="test",
-        command="echo {{ value }}",
-        description="Test",
-        variables=[VariableSpec(name="value", type="string", required=True, description="")]
-    )
-    
-    expander = CommandExpander()
-    
-    # String stays string
-    result = expander.expand(template, {"value": "hello"})
-    assert result.success == True
-    assert result.variables_used["value"] == "hello"
-    
-    # Number converts to string
-    result = expander.expand(template, {"value": 123})
-    assert result.success == True
-    assert result.variables_used["value"] == "123"
+    result = expander.expand(typed_templates["string"], {"value": value})
+    _check_conversion(result, ok, expected)
 
 
-def test_integer_type_validation():
+@pytest.mark.parametrize("value,ok,expected", [
+    (42, True, 42),                         # Integer accepted
+    ("42", True, 42),                       # String integer converts
+    (True, False, "boolean"),               # Boolean rejected
+    ("not-a-number", False, "integer"),     # Invalid string rejected
+])
+def test_integer_type_validation(expander, typed_templates, value, ok, expected):
     """Test integer type validation and conversion"""
-    template = Template(
-        name="test",
-        command="echo {{ count }}",
-        description="Test",
-        variables=[VariableSpec(name="count", type="integer", required=True, description="")]
-    )
-    
-    expander = CommandExpander()
-    
-    # Integer accepted
-    result = expander.expand(template, {"count": 42})
-    assert result.success == True
-    assert result.variables_used["count"] == 42
-    
-    # String integer converts
-    result = expander.expand(template, {"count": "42"})
-    assert result.success == True
-    assert result.variables_used["count"] == 42
-    
-    # Boolean rejected
-    result = expander.expand(template, {"count": True})
-    assert result.success == False
-    assert "boolean" in result.errors[0].lower()
-    
-    # Invalid string rejected
-    result = expander.expand(template, {"count": "not-a-number"})
-    assert result.success == False
-    assert "integer" in result.errors[0].lower()
+    result = expander.expand(typed_templates["integer"], {"value": value})
+    _check_conversion(result, ok, expected)
 
 
-def test_float_type_validation():
+@pytest.mark.parametrize("value,ok,expected", [
+    (3.14, True, 3.14),                     # Float accepted
+    (42, True, 42.0),                       # Integer converts to float
+    ("3.14", True, pytest.approx(3.14)),    # String number converts
+])
+def test_float_type_validation(expander, typed_templates, value, ok, expected):
     """Test float type validation and conversion"""
-    template = Template(
-        name="test",
-        command="echo {{ value }}",
-        description="Test",
-        variables=[VariableSpec(name="value", type="float", required=True, description="")]
-    )
-    
-    expander = CommandExpander()
-    
-    # Float accepted
-    result = expander.expand(template, {"value": 3.14})
-    assert result.success == True
-    assert result.variables_used["value"] == 3.14
-    
-    # Integer converts to float
-    result = expander.expand(template, {"value": 42})
-    assert result.success == True
-    assert result.variables_used["value"] == 42.0
-    
-    # String number converts
-    result = expander.expand(template, {"value": "3.14"})
-    assert result.success == True
-    assert abs(result.variables_used["value"] - 3.14) < 0.01
+    result = expander.expand(typed_templates["float"], {"value": value})
+    _check_conversion(result, ok, expected)
 
 
-def test_boolean_type_validation():
+@pytest.mark.parametrize("value,ok,expected", [
+    (True, True, True),                     # Boolean accepted
+    ("true", True, True),                   # String "true" converts
+    ("false", True, False),                 # String "false" converts
+    ("maybe", False, "boolean"),            # Other strings rejected
+])
+def test_boolean_type_validation(expander, typed_templates, value, ok, expected):
     """Test boolean type validation and conversion"""
-    template = Template(
-        name="test",
-        command="echo {{ flag }}",
-        description="Test",
-        variables=[VariableSpec(name="flag", type="boolean", required=True, description="")]
-    )
-    
-    expander = CommandExpander()
-    
-    # Boolean accepted
-    result = expander.expand(template, {"flag": True})
-    assert result.success == True
-    assert result.variables_used["flag"] == True
-    
-    # String "true" converts
-    result = expander.expand(template, {"flag": "true"})
-    assert result.success == True
-    assert result.variables_used["flag"] == True
-    
-    # String "false" converts
-    result = expander.expand(template, {"flag": "false"})
-    assert result.success == True
-    assert result.variables_used["flag"] == False
-    
-    # Other strings rejected
-    result = expander.expand(template, {"flag": "maybe"})
-    assert result.success == False
+    result = expander.expand(typed_templates["boolean"], {"value": value})
+    _check_conversion(result, ok, expected)
 
 
 # ===== Validation Tests =====
 
-def test_pattern_validation_success(template_with_pattern):
+def test_pattern_validation_success(expander, template_with_pattern):
     """Test pattern validation accepts valid values"""
-    expander = CommandExpander()
     result = expander.expand(template_with_pattern, {"version": "1.2.3"})
     
-    assert result.success == True
+    assert result.success
     assert result.command == "git tag 1.2.3"
 
 
-def test_pattern_validation_failure(template_with_pattern):
+def test_pattern_validation_failure(expander, template_with_pattern):
     """Test pattern validation rejects invalid values"""
-    expander = CommandExpander()
-    
     # Invalid format
     result = expander.expand(template_with_pattern, {"version": "v1.2.3"})
-    assert result.success == False
+    assert not result.success
     assert "pattern" in result.errors[0].lower()
     
     # Missing patch version
     result = expander.expand(template_with_pattern, {"version": "1.2"})
-    assert result.success == False
+    assert not result.success
 
 
-def test_options_validation_success(template_with_options):
+def test_options_validation_success(expander, template_with_options):
     """Test options validation accepts valid values"""
-    expander = CommandExpander()
     result = expander.expand(
         template_with_options,
         {"environment": "prod", "region": "eu-west-1"}
     )
     
-    assert result.success == True
+    assert result.success
     assert "prod" in result.command
     assert "eu-west-1" in result.command
 
 
-def test_options_validation_failure(template_with_options):
+def test_options_validation_failure(expander, template_with_options):
     """Test options validation rejects invalid values"""
-    expander = CommandExpander()
-    
     # Invalid environment
     result = expander.expand(template_with_options, {"environment": "production"})
-    assert result.success == False
+    assert not result.success
     assert "one of" in result.errors[0].lower()
     assert "dev" in result.errors[0]
 
 
-def test_range_validation_success(template_with_range):
+def test_range_validation_success(expander, template_with_range):
     """Test range validation accepts valid values"""
-    expander = CommandExpander()
     result = expander.expand(
         template_with_range,
         {"memory": 2048, "cpu": 2.0}
     )
     
-    assert result.success == True
+    assert result.success
     assert "2048" in result.command
     assert "2.0" in result.command
 
 
-def test_range_validation_min_failure(template_with_range):
+def test_range_validation_min_failure(expander, template_with_range):
     """Test range validation rejects values below minimum"""
-    expander = CommandExpander()
     result = expander.expand(
         template_with_range,
         {"memory": 256, "cpu": 2.0}  # memory too low
     )
     
-    assert result.success == False
+    assert not result.success
     assert "512" in result.errors[0]  # Shows minimum
 
 
-def test_range_validation_max_failure(template_with_range):
+def test_range_validation_max_failure(expander, template_with_range):
     """Test range validation rejects values above maximum"""
-    expander = CommandExpander()
     result = expander.expand(
         template_with_range,
         {"memory": 32768, "cpu": 2.0}  # memory too high
     )
     
-    assert result.success == False
+    assert not result.success
     assert "16384" in result.errors[0]  # Shows maximum
 
 
 # ===== Complex Template Tests =====
 
-def test_complex_template_all_defaults(complex_template):
-    """Test complex template with all default values"""
-    expander = CommandExpander()
-    result = expander.expand(complex_template, {})
-    
-    assert result.success == True
-    assert "tests/" in result.command
-    assert "src/" in result.command
-    assert "-v" in result.command  # verbose=True
-    assert "--workers=4" in result.command
-
-
-def test_complex_template_mixed_values(complex_template):
-    """Test complex template with mix of provided and default values"""
-    expander = CommandExpander()
-    result = expander.expand(
-        complex_template,
-        {"path": "tests/unit", "verbose": False, "workers": 8}
-    )
-    
-    assert result.success == True
-    assert "tests/unit" in result.command
-    assert "src/" in result.command  # default
-    assert "-q" in result.command  # verbose=False
-    assert "--workers=8" in result.command
-
-
-def test_complex_template_all_provided(complex_template):
-    """Test complex template with all values provided"""
-    expander = CommandExpander()
-    result = expander.expand(
-        complex_template,
+@pytest.mark.parametrize("variables,expected,warning_count", [
+    # All defaults: path, coverage, verbose=True, workers
+    ({}, ["tests/", "src/", "-v", "--workers=4"], 4),
+    # Mixed: coverage falls back to its default
+    (
+        {"path": "tests/unit", "verbose": False, "workers": 8},
+        ["tests/unit", "src/", "-q", "--workers=8"],
+        1,
+    ),
+    # All provided: no defaults used
+    (
         {
             "path": "tests/integration",
             "coverage": "lib/",
             "verbose": True,
             "workers": 12
-        }
-    )
+        },
+        ["tests/integration", "lib/", "-v", "--workers=12"],
+        0,
+    ),
+], ids=["all_defaults", "mixed_values", "all_provided"])
+def test_complex_template(expander, complex_template, variables, expected, warning_count):
+    """Test complex template with default, mixed and provided values"""
+    result = expander.expand(complex_template, variables)
     
-    assert result.success == True
-    assert "tests/integration" in result.command
-    assert "lib/" in result.command
-    assert "-v" in result.command
-    assert "--workers=12" in result.command
-    assert len(result.warnings) == 0  # No defaults used
+    assert result.success
+    for fragment in expected:
+        assert fragment in result.command
+    assert len(result.warnings) == warning_count
 
 
 # ===== Error Handling Tests =====
 
-def test_multiple_errors():
+def test_multiple_errors(expander):
     """Test handling multiple validation errors"""
     template = Template(
         name="multi",
@@ -507,14 +445,13 @@ def test_multiple_errors():
         ]
     )
     
-    expander = CommandExpander()
     result = expander.expand(template, {"var1": "not-a-number", "var2": "invalid"})
     
-    assert result.success == False
+    assert not result.success
     assert len(result.errors) >= 2
 
 
-def test_template_syntax_error():
+def test_template_syntax_error(expander):
     """Test handling of invalid Jinja2 syntax"""
     template = Template(
         name="broken",
@@ -523,18 +460,46 @@ def test_template_syntax_error():
         variables=[]
     )
     
-    expander = CommandExpander()
     result = expander.expand(template, {})
     
-    assert result.success == False
+    assert not result.success
     assert len(result.errors) > 0
 
 
+# ===== Batch Expansion Tests =====
+
+def test_expand_many(expander, simple_template):
+    """Test batch expansion yields one result per row, in order"""
+    rows = [{"message": "one"}, {}, {"message": "three"}]
+    
+    results = list(expander.expand_many(simple_template, rows))
+    
+    assert [r.success for r in results] == [True, False, True]
+    assert results[0].command == "echo 'one'"
+    assert results[2].command == "echo 'three'"
+    assert "required" in results[1].errors[0].lower()
+
+
+def test_expand_many_syntax_error(expander):
+    """Test batch expansion reports template syntax errors per row"""
+    template = Template(
+        name="broken",
+        command="echo {{ missing_brace",
+        description="Broken template",
+        variables=[]
+    )
+    
+    results = list(expander.expand_many(template, [{}, {}]))
+    
+    assert len(results) == 2
+    assert all(not r.success for r in results)
+    assert all("syntax" in r.errors[0].lower() for r in results)
+
+
 # ===== Preview Tests =====
 
-def test_preview_success(simple_template):
+def test_preview_success(expander, simple_template):
     """Test preview generation for successful expansion"""
-    expander = CommandExpander()
     preview = expander.preview(simple_template, {"message": "Test"})
     
     assert "echo" in preview.lower()
@@ -543,19 +508,16 @@ def test_preview_success(simple_template):
     assert "message = Test" in preview
 
 
-def test_preview_failure(simple_template):
+def test_preview_failure(expander, simple_template):
     """Test preview generation for failed expansion"""
-    expander = CommandExpander()
     preview = expander.preview(simple_template, {})
     
     assert "failed" in preview.lower() or "✗" in preview
-    assert "required" in preview.lower()
-    assert "message" in preview.lower()
+    assert _contains_all(preview, "required", "message")
 
 
-def test_preview_with_warnings(template_with_defaults):
+def test_preview_with_warnings(expander, template_with_defaults):
     """Test preview shows warnings for default values"""
-    expander = CommandExpander()
     preview = expander.preview(template_with_defaults, {})
     
     assert "warning" in preview.lower() or "⚠" in preview
@@ -569,7 +531,7 @@ def test_expand_template_function(simple_template):
     result = expand_template(simple_template, {"message": "Hello"})
     
     assert isinstance(result, ExpansionResult)
-    assert result.success == True
+    assert result.success
     assert result.command == "echo 'Hello'"
 
 
@@ -581,47 +543,55 @@ def test_preview_template_function(simple_template):
     assert "Hello" in preview
 
 
+def test_clear_compile_cache(simple_template):
+    """Test clearing the compile cache shared by all expanders"""
+    first, second = CommandExpander(), CommandExpander()
+    compiled = first._compile(simple_template.command)
+    assert second._compile(simple_template.command) is compiled
+    
+    clear_compile_cache()
+    
+    assert first._compile(simple_template.command) is not compiled
+    assert second.expand(simple_template, {"message": "Hello"}).command == "echo 'Hello'"
+
+
 # ===== Edge Cases =====
 
-def test_empty_variables_dict(simple_template):
+def test_empty_variables_dict(expander, simple_template):
     """Test expansion with empty variables dict"""
-    expander = CommandExpander()
     result = expander.expand(simple_template, {})
     
-    assert result.success == False  # Required variable missing
+    assert not result.success  # Required variable missing
 
 
-def test_none_variables(template_with_defaults):
+def test_none_variables(expander, template_with_defaults):
     """Test expansion with None as variables (should use defaults)"""
-    expander = CommandExpander()
     result = expander.expand(template_with_defaults, None)
     
-    assert result.success == True
+    assert result.success
     assert result.variables_used["port"] == 8080
 
 
-def test_extra_variables(simple_template):
+def test_extra_variables(expander, simple_template):
     """Test expansion ignores extra variables"""
-    expander = CommandExpander()
     result = expander.expand(
         simple_template,
         {"message": "Hello", "extra": "ignored"}
     )
     
-    assert result.success == True
+    assert result.success
     assert "extra" not in result.variables_used
 
 
-def test_empty_string_value(simple_template):
+def test_empty_string_value(expander, simple_template):
     """Test expansion with empty string (should be valid for string type)"""
-    expander = CommandExpander()
     result = expander.expand(simple_template, {"message": ""})
     
-    assert result.success == True
+    assert result.success
     assert result.command == "echo ''"
 
 
-def test_zero_values(template_with_range):
+def test_zero_values(expander, template_with_range):
     """Test expansion handles zero values correctly"""
     template = Template(
         name="test",
@@ -639,13 +609,30 @@ def test_zero_values(template_with_range):
         ]
     )
     
-    expander = CommandExpander()
     result = expander.expand(template, {"value": 0})
     
-    assert result.success == True
+    assert result.success
     assert result.variables_used["value"] == 0
 
 
+def test_literal_braces_and_missing_optional(expander):
+    """Test placeholder-only commands keep literal braces and blank missing vars"""
+    template = Template(
+        name="awk",
+        command="awk '{print $1}' {{ file }}{{ suffix }}",
+        description="Test",
+        variables=[
+            VariableSpec(name="file", type="string", required=True, description=""),
+            VariableSpec(name="suffix", type="string", description="")
+        ]
+    )
+    
+    result = expander.expand(template, {"file": "data.txt"})
+    
+    assert result.success
+    assert result.command == "awk '{print $1}' data.txt"
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
 
@@ -0,0 +1,210 @@
+"""
+Test suite for history.py
+
+Tests cover:
+- Converting history saved as a single JSON document
+- Files that are not history at all
+- Debounced saving, flush and close
+- max_entries eviction
+- Damaged lines
+- Tail reads through mmap
+"""
+
+import pytest
+import json
+from pathlib import Path
+
+# Add parent directory to path for imports
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import history
+from history import CommandHistory, read_recent
+
+
+# ===== Fixtures =====
+
+@pytest.fixture
+def legacy_document():
+    """History as saved by versions before JSON Lines"""
+    entries = [
+        {
+            "timestamp": f"2025-11-13T20:00:0{n}",
+            "template_name": "commit",
+            "workflow": "git",
+            "command": f"git commit -m 'change {n}'",
+            "variables": {"message": f"change {n}"},
+            "executed": True,
+            "exit_code": 0
+        }
+        for n in range(3)
+    ]
+    return json.dumps({"version": "1.0", "history": entries}, indent=2)
+
+
+def add_entries(recorder, specs):
+    """Add (template_name, workflow, executed) entries in order"""
+    for template_name, workflow, executed in specs:
+        recorder.add(template_name, workflow, f"run {template_name}", {}, executed=executed)
+
+
+# ===== Legacy Format Tests =====
+
+def test_legacy_history_file_converted(tmp_path, legacy_document):
+    """Test an old-format history_file is converted in place and backed up"""
+    history_file = tmp_path / "history.json"
+    history_file.write_text(legacy_document)
+    
+    loaded = CommandHistory(history_file)
+    
+    assert [e.command for e in loaded.entries] == [
+        "git commit -m 'change 0'",
+        "git commit -m 'change 1'",
+        "git commit -m 'change 2'",
+    ]
+    assert len(history_file.read_text().splitlines()) == 3
+    assert (tmp_path / "history.json.bak").read_text() == legacy_document
+    assert len(CommandHistory(history_file).entries) == 3
+
+
+def test_legacy_default_file_migrated(tmp_path, legacy_document, monkeypatch):
+    """Test the default history file is seeded from the old default file"""
+    legacy_file = tmp_path / ".tmx-history.json"
+    legacy_file.write_text(legacy_document)
+    monkeypatch.setattr(history, "DEFAULT_HISTORY_FILE", tmp_path / ".tmx-history.jsonl")
+    monkeypatch.setattr(history, "LEGACY_HISTORY_FILE", legacy_file)
+    
+    loaded = CommandHistory()
+    
+    assert len(loaded.entries) == 3
+    assert len((tmp_path / ".tmx-history.jsonl").read_text().splitlines()) == 3
+    assert legacy_file.read_text() == legacy_document
+
+
+def test_unrecognised_file_left_alone(tmp_path):
+    """Test a file with no readable entries is never rewritten"""
+    history_file = tmp_path / "history.jsonl"
+    history_file.write_text("not json\nat all\n")
+    
+    loaded = CommandHistory(history_file)
+    
+    assert len(loaded.entries) == 0
+    assert history_file.read_text() == "not json\nat all\n"
+
+
+
+# ===== Saving Tests =====
+
+def test_close_saves_pending_entries(tmp_path):
+    """Test close saves entries held back by the save debounce"""
+    history_file = tmp_path / "history.jsonl"
+    recorder = CommandHistory(history_file, flush_interval=60)
+    recorder.add("commit", "git", "git commit -m 'a'", {"message": "a"})
+    recorder.add("commit", "git", "git commit -m 'b'", {"message": "b"})
+    
+    recorder.close()
+    
+    assert len(history_file.read_text().splitlines()) == 2
+    assert len(CommandHistory(history_file).entries) == 2
+
+
+def test_flush_after_debounced_add(tmp_path):
+    """Test flush saves an entry the debounce held back"""
+    history_file = tmp_path / "history.jsonl"
+    recorder = CommandHistory(history_file, flush_interval=60)
+    recorder.add("commit", "git", "git commit -m 'a'", {"message": "a"})
+    recorder.add("push", "git", "git push", {})
+    assert len(history_file.read_text().splitlines()) == 1
+    
+    recorder.flush()
+    
+    assert [e.template_name for e in read_recent(history_file, 5)] == ["push", "commit"]
+    recorder.close()
+
+
+# ===== Trimming Tests =====
+
+def test_max_entries_eviction_keeps_stats_and_search(tmp_path):
+    """Test evicting old entries updates stats and search together"""
+    recorder = CommandHistory(tmp_path / "history.jsonl", max_entries=3)
+    add_entries(recorder, [
+        ("commit", "git", True),
+        ("push", "git", False),
+        ("test", "testing", True),
+        ("deploy", "deployment", True),
+        ("commit", "git", False),
+    ])
+    
+    stats = recorder.get_stats()
+    assert stats['total_commands'] == 3
+    assert stats['executed_commands'] == 2
+    assert stats['by_workflow'] == {'testing': 1, 'deployment': 1, 'git': 1}
+    assert stats['by_template'] == {'test': 1, 'deploy': 1, 'commit': 1}
+    
+    assert [e.template_name for e in recorder.search(workflow="git")] == ["commit"]
+    assert recorder.search(template_name="push") == []
+    assert len(recorder.search(executed_only=True)) == stats['executed_commands']
+    for template_name, count in stats['by_template'].items():
+        assert len(recorder.search(template_name=template_name)) == count
+    recorder.close()
+
+
+def test_max_entries_trims_file_on_load(tmp_path):
+    """Test loading keeps only the newest max_entries entries"""
+    history_file = tmp_path / "history.jsonl"
+    recorder = CommandHistory(history_file, flush_interval=0)
+    add_entries(recorder, [(f"t{n}", "wf", False) for n in range(5)])
+    recorder.close()
+    
+    reloaded = CommandHistory(history_file, max_entries=2)
+    
+    assert [e.template_name for e in reloaded.entries] == ["t3", "t4"]
+    assert reloaded.get_stats()['by_template'] == {'t3': 1, 't4': 1}
+    assert len(history_file.read_text().splitlines()) == 2
+
+
+# ===== Damaged File Tests =====
+
+def test_truncated_last_line(tmp_path):
+    """Test a last line cut short is skipped and removed from the file"""
+    history_file = tmp_path / "history.jsonl"
+    recorder = CommandHistory(history_file, flush_interval=0)
+    add_entries(recorder, [("commit", "git", True), ("push", "git", True)])
+    recorder.close()
+    with open(history_file, "a") as f:
+        f.write('{"timestamp": "2025-11-13T20:00:00", "template_na')
+    
+    assert [e.template_name for e in read_recent(history_file, 5)] == ["push", "commit"]
+    
+    reloaded = CommandHistory(history_file)
+    
+    assert [e.template_name for e in reloaded.entries] == ["commit", "push"]
+    assert reloaded.get_stats()['total_commands'] == 2
+    assert len(history_file.read_text().splitlines()) == 2
+    assert history_file.read_text().endswith("\n")
+
+
+# ===== Tail Read Tests =====
+
+def test_read_recent_mmap_matches_plain_read(tmp_path, monkeypatch):
+    """Test tail reads give the same result at, above and below the mmap threshold"""
+    history_file = tmp_path / "history.jsonl"
+    recorder = CommandHistory(history_file, flush_interval=0)
+    add_entries(recorder, [(f"t{n}", "wf", n % 2 == 0) for n in range(20)])
+    recorder.close()
+    with open(history_file, "a") as f:
+        f.write("damaged\n\n")
+    size = history_file.stat().st_size
+    
+    monkeypatch.setattr(history, "_MMAP_THRESHOLD", size + 1)
+    plain = [read_recent(history_file, limit) for limit in (1, 5, 20, 50)]
+    
+    for threshold in (size, 1):
+        monkeypatch.setattr(history, "_MMAP_THRESHOLD", threshold)
+        assert [read_recent(history_file, limit) for limit in (1, 5, 20, 50)] == plain
+    
+    assert [e.template_name for e in plain[1]] == ["t19", "t18", "t17", "t16", "t15"]
+    assert len(plain[3]) == 20
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -30,13 +30,16 @@ from template_loader import (
     load_workflow,
     get_template_by_name,
     get_template_by_alias,
-    validate_template
+    validate_template,
+    extract_vars,
+    parse_bool,
+    TemplateLoader
 )
 
 
 # ===== Fixtures =====
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_valid_yaml():
     """Sample valid YAML template content"""
     return """
@@ -61,7 +64,7 @@ templates:
       confirm: false
 """
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_complex_yaml():
     """Sample YAML with multiple templates and complex variables"""
     return """
@@ -106,7 +109,7 @@ templates:
       dangerous: false
 """
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_invalid_yaml():
     """Sample invalid YAML (malformed)"""
     return """
@@ -121,13 +124,17 @@ templates:
         required: not_a_boolean
 """
 
-@pytest.fixture
-def temp_yaml_file(tmp_path):
-    """Create a temporary YAML file"""
+@pytest.fixture(scope="module")
+def temp_yaml_file(tmp_path_factory):
+    """Create a temporary YAML file, written once per distinct content"""
+    root = tmp_path_factory.mktemp("templates")
+    written = {}
     def _create_file(content):
-        file_path = tmp_path / "test_template.yaml"
-        file_path.write_text(content)
-        return str(file_path)
+        if content not in written:
+            file_path = root / f"template_{len(written)}.yaml"
+            file_path.write_text(content)
+            written[content] = str(file_path)
+        return written[content]
     return _create_file
 
 
@@ -301,6 +308,22 @@ def test_validate_template_invalid_variable_type():
     assert any("type" in error.lower() for error in errors)
 
 
+def test_validate_template_required_variable_usage():
+    """Test required variables must appear as whole names in the command"""
+    template = Template(
+        name="echo",
+        command="echo {{msg_long}} {{  target|upper }}",
+        description="Echo",
+        variables=[
+            VariableSpec(name="msg", description="Message", required=True),
+            VariableSpec(name="target", description="Target", required=True)
+        ]
+    )
+    
+    is_valid, errors = validate_template(template)
+    assert not is_valid
+    assert errors == ["Required variable 'msg' not found in command"]
+
 # ===== Alias Resolution Tests =====
 
 def test_get_template_by_alias(sample_valid_yaml, temp_yaml_file):
@@ -531,6 +554,147 @@ templates:
     assert "grep" in template.command
 
 
+
+# ===== TemplateLoader Tests =====
+
+def test_template_loader_directory(tmp_path):
+    """Test TemplateLoader builds templates from a workflow-keyed file"""
+    (tmp_path / "demo.yaml").write_text("""
+workflow: demo
+description: Demo commands
+templates:
+  hello:
+    description: Greet someone
+    command: "echo {{ who }}"
+    dangerous: true
+    aliases: [hi]
+    variables:
+      who:
+        description: Who to greet
+        required: true
+""")
+    loader = TemplateLoader(tmp_path)
+    loader.load_all()
+    
+    template = loader.get_template("hi")
+    assert template is not None
+    assert template.variables[0].name == "who"
+    assert template.safety == {'dangerous': True, 'confirm': False}
+    assert loader.list_templates() == [template]
+    assert loader.validate_template(template) == []
+
+
+def test_template_loader_parses_lazily(tmp_path):
+    """Test TemplateLoader parses a workflow's file only when needed"""
+    for name in ("alpha", "beta"):
+        (tmp_path / f"{name}.yaml").write_text(f"""
+workflow: {name}
+templates:
+  run:
+    description: Run {name}
+    command: "{name} run"
+""")
+    loader = TemplateLoader(tmp_path)
+    loader.load_all()
+    assert loader.workflows == {}
+    
+    template = loader.get_template("beta.run")
+    assert template.command == "beta run"
+    assert list(loader.workflows) == ["beta"]
+    
+    assert len(loader.list_templates()) == 2
+    assert sorted(loader.workflows) == ["alpha", "beta"]
+
+
+@pytest.mark.parametrize("declaration", [
+    'workflow: "my flow"',
+    "workflow: 'my flow'",
+    "workflow: my flow  # spaced",
+    'workflow: "my flow" # quoted',
+])
+def test_template_loader_indexes_whole_workflow_name(tmp_path, declaration):
+    """Test TemplateLoader indexes a file under the workflow name YAML reads"""
+    (tmp_path / "flow.yaml").write_text(f"""
+{declaration}
+templates:
+  run:
+    description: Run it
+    command: "run"
+""")
+    loader = TemplateLoader(tmp_path)
+    loader.load_all()
+    
+    assert [t.name for t in loader.list_templates("my flow")] == ["run"]
+
+
+def test_template_loader_parses_unindexable_files_eagerly(tmp_path):
+    """Test TemplateLoader parses files whose workflow line it cannot index"""
+    (tmp_path / "odd.yaml").write_text("""
+workflow: "odd \\"flow\\""
+templates:
+  run:
+    description: Run it
+    command: "run"
+""")
+    loader = TemplateLoader(tmp_path)
+    loader.load_all()
+    
+    assert list(loader.workflows) == ['odd "flow"']
+    assert loader._file_index == {}
+
+
+def test_template_loader_unknown_workflow_loads_all(tmp_path):
+    """Test listing a workflow missing from the index parses every file"""
+    (tmp_path / "alpha.yaml").write_text("""
+workflow: alpha
+templates:
+  run:
+    description: Run alpha
+    command: "alpha run"
+""")
+    loader = TemplateLoader(tmp_path)
+    loader.load_all()
+    
+    assert loader.list_templates("missing") == []
+    assert list(loader.workflows) == ["alpha"]
+
+# ===== Boolean Parsing Tests =====
+
+@pytest.mark.parametrize("text, expected", [
+    ("true", True), ("Yes", True), ("1", True), ("ON", True),
+    ("false", False), ("no", False), ("0", False), ("Off", False),
+])
+def test_parse_bool(text, expected):
+    """Test accepted boolean spellings, in any case"""
+    assert parse_bool(text) is expected
+
+
+def test_parse_bool_rejects_other_text():
+    """Test unrecognised spellings raise ValueError"""
+    with pytest.raises(ValueError):
+        parse_bool("maybe")
+
+
+# ===== Placeholder Extraction Tests =====
+
+def test_extract_vars():
+    """Test placeholder extraction from command strings"""
+    command = "git commit -m '{{ message }}' {{amend|lower}} && echo {{ message }}"
+    assert extract_vars(command) == ['message', 'amend']
+    assert extract_vars("git status") == []
+    # Expressions and tags are not simple placeholders
+    assert extract_vars("{% if force %}--force{% endif %} {{ a + b }}") == []
+
+
+def test_template_placeholders(sample_valid_yaml, temp_yaml_file):
+    """Test a loaded template lists its simple placeholders"""
+    file_path = temp_yaml_file(sample_valid_yaml)
+    workflow = load_workflow(file_path)
+    template = workflow.templates[0]
+    
+    assert template.placeholders() == extract_vars(template.command)
+    assert template.placeholders() == [var.name for var in template.variables]
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
 
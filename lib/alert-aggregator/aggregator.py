@@ -4,9 +4,10 @@ Alert Aggregator Core Engine
 Central orchestration for alert ingestion, deduplication, routing, and storage.
 """
 
-from typing import Dict, List, Optional, Callable, Any
+from typing import Dict, List, Optional, Callable, Any, Tuple
 from datetime import datetime
 import logging
+import threading
 from pathlib import Path
 
 from .models import Alert, AlertSeverity, AlertStatus, RoutingRule, AlertStats, ChannelType
@@ -53,7 +54,18 @@ class AlertAggregator:
         
         # State
         self.active_alerts: Dict[str, Alert] = {}  # fingerprint -> alert
+        # (source, severity) -> {fingerprint: alert}; duplicates must share
+        # both, so fuzzy matching only scans one bucket
+        self._active_by_kind: Dict[Tuple[str, AlertSeverity], Dict[str, Alert]] = {}
+        # id -> alert for active alerts that opted out of deduplication; kept
+        # apart because several may share a fingerprint
+        self._unique_alerts: Dict[str, Alert] = {}
         self.stats = AlertStats()
+        # Guards the active alert maps and stats across threads
+        # (e.g. Flask workers). One lock rather than striped shards: fuzzy
+        # deduplication compares alerts with different fingerprints, and the
+        # GIL serializes the work inside the lock anyway.
+        self._lock = threading.RLock()
         
         # Callbacks
         self.callbacks: List[Callable] = []
@@ -70,34 +82,38 @@ class AlertAggregator:
         Returns:
             Processed alert (original or merged duplicate)
         """
-        # Check for duplicates
-        if self.deduplicator.enabled:
-            existing = self.deduplicator.find_duplicate(alert, self.active_alerts)
+        # Duplicate check and state updates happen under the lock so two
+        # threads ingesting the same alert cannot both admit it as new
+        with self._lock:
+            existing = None
+            if self.deduplicator.enabled:
+                existing = self.deduplicator.find_duplicate(
+                    alert,
+                    self.active_alerts,
+                    self._active_by_kind.get((alert.source, alert.severity), {})
+                )
             
             if existing:
                 # Merge as duplicate
                 existing.merge_duplicate(alert)
-                logger.debug(f"Merged duplicate alert: {alert.fingerprint} (count: {existing.duplicate_count})")
-                
-                # Update storage
                 self.storage.update_alert(existing)
-                
-                # Update stats
                 self.stats.duplicates_merged += 1
-                
-                # Trigger callbacks
-                self._trigger_callbacks('duplicate_merged', existing)
-                
-                return existing
-        
-        # New unique alert
-        self.active_alerts[alert.fingerprint] = alert
-        
-        # Store in database
-        self.storage.store_alert(alert)
-        
-        # Update stats
-        self.stats.update(alert)
+            else:
+                # New unique alert
+                if self.deduplicator.is_unique(alert):
+                    self._unique_alerts[alert.id] = alert
+                else:
+                    self._set_active(alert)
+                self.storage.store_alert(alert)
+                self.stats.update(alert)
+        
+        if existing:
+            logger.debug(f"Merged duplicate alert: {alert.fingerprint} (count: {existing.duplicate_count})")
+            
+            # Trigger callbacks
+            self._trigger_callbacks('duplicate_merged', existing)
+            
+            return existing
         
         # Route to channels
         self._route_alert(alert)
@@ -109,6 +125,46 @@ class AlertAggregator:
         
         return alert
     
+    def _find_alert(self, alert_id: str) -> Optional[Alert]:
+        """Find an alert by ID: the live active alert if it is one, else the stored copy."""
+        if alert_id in self._unique_alerts:
+            return self._unique_alerts[alert_id]
+        
+        stored = self.storage.get_alert(alert_id)
+        if stored is None:
+            return None
+        
+        active = self.active_alerts.get(stored.fingerprint)
+        if active is not None and active.id == alert_id:
+            return active
+        return stored
+    
+    def _is_active(self, alert: Alert) -> bool:
+        """Check whether this alert object (not just its fingerprint) is active."""
+        return (
+            self.active_alerts.get(alert.fingerprint) is alert
+            or self._unique_alerts.get(alert.id) is alert
+        )
+    
+    def _set_active(self, alert: Alert):
+        """Add or replace an active alert, keeping the kind index in step."""
+        kind = (alert.source, alert.severity)
+        previous = self.active_alerts.get(alert.fingerprint)
+        if previous is not None and (previous.source, previous.severity) != kind:
+            self._remove_active(alert.fingerprint)
+        
+        self.active_alerts[alert.fingerprint] = alert
+        self._active_by_kind.setdefault(kind, {})[alert.fingerprint] = alert
+    
+    def _remove_active(self, fingerprint: str):
+        """Drop an active alert from the active set and the kind index."""
+        alert = self.active_alerts.pop(fingerprint)
+        kind = (alert.source, alert.severity)
+        bucket = self._active_by_kind[kind]
+        del bucket[fingerprint]
+        if not bucket:
+            del self._active_by_kind[kind]
+    
     def _route_alert(self, alert: Alert):
         """
         Route alert to appropriate channels.
@@ -133,19 +189,22 @@ class AlertAggregator:
         Returns:
             True if successful
         """
-        alert = self.storage.get_alert(alert_id)
+        # Looked up under the lock so a duplicate merged meanwhile is not
+        # overwritten by a stale stored copy
+        with self._lock:
+            alert = self._find_alert(alert_id)
+            if alert is not None:
+                active = self._is_active(alert)
+                old_status = alert.status
+                alert.acknowledge(by)
+                self.storage.update_alert(alert)
+                if active:
+                    self.stats.update_status(old_status, alert.status)
         
         if not alert:
             logger.warning(f"Alert not found: {alert_id}")
             return False
         
-        alert.acknowledge(by)
-        self.storage.update_alert(alert)
-        
-        # Update active alerts if present
-        if alert.fingerprint in self.active_alerts:
-            self.active_alerts[alert.fingerprint] = alert
-        
         self._trigger_callbacks('alert_acknowledged', alert)
         logger.info(f"Acknowledged alert: {alert_id}")
         
@@ -161,19 +220,24 @@ class AlertAggregator:
         Returns:
             True if successful
         """
-        alert = self.storage.get_alert(alert_id)
+        with self._lock:
+            alert = self._find_alert(alert_id)
+            if alert is not None:
+                active = self._is_active(alert)
+                old_status = alert.status
+                alert.resolve()
+                self.storage.update_alert(alert)
+                
+                # Remove from active alerts
+                if active:
+                    self.stats.update_status(old_status, alert.status)
+                    if self._unique_alerts.pop(alert.id, None) is None:
+                        self._remove_active(alert.fingerprint)
         
         if not alert:
             logger.warning(f"Alert not found: {alert_id}")
             return False
         
-        alert.resolve()
-        self.storage.update_alert(alert)
-        
-        # Remove from active alerts
-        if alert.fingerprint in self.active_alerts:
-            del self.active_alerts[alert.fingerprint]
-        
         self._trigger_callbacks('alert_resolved', alert)
         logger.info(f"Resolved alert: {alert_id}")
         
@@ -205,6 +269,35 @@ class AlertAggregator:
             limit=limit
         )
     
+    def get_alert_fields(
+        self,
+        fields: List[str],
+        severity: Optional[AlertSeverity] = None,
+        status: Optional[AlertStatus] = None,
+        source: Optional[str] = None,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """
+        Query selected alert fields.
+        
+        Args:
+            fields: Field names as in Alert.to_dict()
+            severity: Filter by severity
+            status: Filter by status
+            source: Filter by source
+            limit: Maximum results
+        
+        Returns:
+            List of dictionaries holding only the requested fields
+        """
+        return self.storage.query_alert_fields(
+            fields,
+            severity=severity,
+            status=status,
+            source=source,
+            limit=limit
+        )
+    
     def get_stats(self) -> AlertStats:
         """Get current statistics."""
         return self.stats
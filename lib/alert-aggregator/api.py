@@ -4,17 +4,26 @@ RESTful API for Alert Aggregator
 Provides HTTP endpoints for alert submission and retrieval.
 """
 
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 import logging
 import json
 
-from .models import Alert, AlertSeverity, AlertStatus
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+from .models import Alert, _SEVERITY_BY_VALUE, _STATUS_BY_VALUE
 from .aggregator import AlertAggregator
 from .collector import AlertCollector
 
 logger = logging.getLogger(__name__)
 
+# Fields every submitted alert must carry, checked in this order
+_REQUIRED_FIELDS = ('source', 'severity', 'title', 'message')
+
 
 class AlertAPI:
     """
@@ -50,8 +59,7 @@ class AlertAPI:
         """
         try:
             # Validate required fields
-            required = ['source', 'severity', 'title', 'message']
-            for field in required:
+            for field in _REQUIRED_FIELDS:
                 if field not in data:
                     return {
                         'success': False,
@@ -82,7 +90,8 @@ class AlertAPI:
         severity: Optional[str] = None,
         status: Optional[str] = None,
         source: Optional[str] = None,
-        limit: int = 100
+        limit: int = 100,
+        fields: Optional[List[str]] = None
     ) -> dict:
         """
         Retrieve alerts.
@@ -92,13 +101,40 @@ class AlertAPI:
             status: Filter by status
             source: Filter by source
             limit: Maximum results
+            fields: Only return these alert fields (default: all)
         
         Returns:
             Response dictionary
         """
         try:
-            severity_enum = AlertSeverity(severity) if severity else None
-            status_enum = AlertStatus(status) if status else None
+            severity_enum = _SEVERITY_BY_VALUE.get(severity) if severity else None
+            if severity and severity_enum is None:
+                return {
+                    'success': False,
+                    'error': f'Invalid severity: {severity}'
+                }
+            
+            status_enum = _STATUS_BY_VALUE.get(status) if status else None
+            if status and status_enum is None:
+                return {
+                    'success': False,
+                    'error': f'Invalid status: {status}'
+                }
+            
+            if fields:
+                # Selected columns straight from storage, no Alert objects
+                alerts = self.aggregator.get_alert_fields(
+                    fields,
+                    severity=severity_enum,
+                    status=status_enum,
+                    source=source,
+                    limit=limit
+                )
+                return {
+                    'success': True,
+                    'count': len(alerts),
+                    'alerts': alerts
+                }
             
             alerts = self.aggregator.get_alerts(
                 severity=severity_enum,
@@ -207,38 +243,45 @@ def create_flask_app(aggregator: AlertAggregator):
         Flask app
     """
     try:
-        from flask import Flask, request, jsonify
+        from flask import Flask, Response, request, jsonify
     except ImportError:
         raise ImportError("Flask required for HTTP server")
     
     app = Flask(__name__)
     api = AlertAPI(aggregator)
     
+    def respond(payload: dict):
+        """Serialize a response payload, with orjson when installed."""
+        if ORJSON_AVAILABLE:
+            return Response(orjson.dumps(payload), mimetype='application/json')
+        return jsonify(payload)
+    
     @app.route('/alerts', methods=['POST'])
     def submit():
-        return jsonify(api.submit_alert(request.json))
+        return respond(api.submit_alert(request.json))
     
     @app.route('/alerts', methods=['GET'])
     def get_alerts():
-        return jsonify(api.get_alerts(
+        return respond(api.get_alerts(
             severity=request.args.get('severity'),
             status=request.args.get('status'),
             source=request.args.get('source'),
-            limit=int(request.args.get('limit', 100))
+            limit=int(request.args.get('limit', 100)),
+            fields=[name for name in request.args.get('fields', '').split(',') if name]
         ))
     
     @app.route('/alerts/<alert_id>/acknowledge', methods=['POST'])
     def acknowledge(alert_id):
         by = request.json.get('by') if request.json else None
-        return jsonify(api.acknowledge_alert(alert_id, by))
+        return respond(api.acknowledge_alert(alert_id, by))
     
     @app.route('/alerts/<alert_id>/resolve', methods=['POST'])
     def resolve(alert_id):
-        return jsonify(api.resolve_alert(alert_id))
+        return respond(api.resolve_alert(alert_id))
     
     @app.route('/stats', methods=['GET'])
     def stats():
-        return jsonify(api.get_stats())
+        return respond(api.get_stats())
     
     return app
 
@@ -1,8 +1,11 @@
 """File alert channel."""
 
+import atexit
 import logging
+import threading
 from pathlib import Path
 from datetime import datetime
+from typing import BinaryIO, Optional
 import json
 
 from ..models import Alert
@@ -11,27 +14,119 @@ logger = logging.getLogger(__name__)
 
 
 class FileChannel:
-    """File output channel."""
-    
-    def __init__(self, output_dir: Path = Path("logs/alerts")):
+    """
+    File output channel.
+
+    Alerts are appended as JSON lines to one file per day. The day's file
+    is kept open with a large write buffer. A background thread sleeps until
+    an alert is written, then flushes the buffer ``flush_interval`` seconds
+    later, so a burst of alerts costs one write syscall rather than an
+    open/write/close per alert. The file is flushed and closed by close(), or
+    at interpreter exit if the channel is still open.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path = Path("logs/alerts"),
+        flush_interval: float = 0.01,
+        buffer_size: int = 128 * 1024
+    ):
         """
         Initialize file channel.
-        
+
         Args:
             output_dir: Directory for alert log files
+            flush_interval: Seconds an alert may wait in the buffer
+            buffer_size: Write buffer size in bytes
         """
         self.output_dir = output_dir
         self.output_dir.mkdir(parents=True, exist_ok=True)
-    
+        self.flush_interval = flush_interval
+        self.buffer_size = buffer_size
+
+        # Log file held open for the current day
+        self._file: Optional[BinaryIO] = None
+        self._date_str: Optional[str] = None
+        self._dirty = False
+        self._lock = threading.Lock()
+        # Wakes the flusher when the buffer becomes dirty or on close
+        self._wake = threading.Condition(self._lock)
+        self._closing = False
+        self._flusher: Optional[threading.Thread] = None
+
     def send(self, alert: Alert):
         """Write alert to file."""
-        # Daily log file
+        line = json.dumps(alert.to_dict()).encode() + b'\n'
         date_str = datetime.now().strftime('%Y-%m-%d')
-        log_file = self.output_dir / f"alerts-{date_str}.jsonl"
-        
-        # Append alert as JSON line
-        with open(log_file, 'a') as f:
-            f.write(json.dumps(alert.to_dict()) + '\n')
-        
-        logger.debug(f"Wrote alert to {log_file}")
 
+        with self._lock:
+            if date_str != self._date_str:
+                self._open(date_str)
+            self._file.write(line)
+            if not self._dirty:
+                self._dirty = True
+                self._wake.notify()
+
+            if self._flusher is None:
+                self._closing = False
+                self._flusher = threading.Thread(
+                    target=self._flush_loop,
+                    name='FileChannel-flush',
+                    daemon=True
+                )
+                self._flusher.start()
+                atexit.register(self.close)
+
+        logger.debug(f"Wrote alert to {self._log_file(date_str)}")
+
+    def _log_file(self, date_str: str) -> Path:
+        """Daily log file for a date."""
+        return self.output_dir / f"alerts-{date_str}.jsonl"
+
+    def _open(self, date_str: str):
+        """Switch to the log file for a new day (called with the lock held)."""
+        if self._file is not None:
+            self._file.close()
+        self._file = open(self._log_file(date_str), 'ab', buffering=self.buffer_size)
+        self._date_str = date_str
+
+    def _flush_loop(self):
+        """Flush buffered alerts shortly after they are written, until closed."""
+        with self._wake:
+            while True:
+                while not self._dirty and not self._closing:
+                    self._wake.wait()
+                if not self._closing:
+                    # Let the rest of a burst join the buffer first
+                    self._wake.wait(self.flush_interval)
+                if self._closing:
+                    return
+                self._flush_locked()
+
+    def flush(self):
+        """Write any buffered alerts to the log file."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        """Flush the log file (called with the lock held)."""
+        if self._dirty and self._file is not None:
+            self._file.flush()
+        self._dirty = False
+
+    def close(self):
+        """Flush and close the log file."""
+        with self._wake:
+            self._closing = True
+            self._wake.notify()
+            flusher = self._flusher
+        if flusher is not None:
+            flusher.join()
+        atexit.unregister(self.close)
+        with self._lock:
+            self._flusher = None
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                self._date_str = None
+                self._dirty = False
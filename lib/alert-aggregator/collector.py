@@ -9,7 +9,7 @@ from datetime import datetime
 import uuid
 import logging
 
-from .models import Alert, AlertSeverity
+from .models import Alert, AlertSeverity, _SEVERITY_BY_VALUE
 
 logger = logging.getLogger(__name__)
 
@@ -54,9 +54,8 @@ class AlertCollector:
         alert_id = str(uuid.uuid4())
         
         # Normalize severity
-        try:
-            severity_enum = AlertSeverity(severity.lower())
-        except ValueError:
+        severity_enum = _SEVERITY_BY_VALUE.get(severity.lower())
+        if severity_enum is None:
             logger.warning(f"Invalid severity '{severity}', defaulting to INFO")
             severity_enum = AlertSeverity.INFO
         
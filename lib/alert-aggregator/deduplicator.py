@@ -42,7 +42,8 @@ class AlertDeduplicator:
     def find_duplicate(
         self,
         alert: Alert,
-        active_alerts: Dict[str, Alert]
+        active_alerts: Dict[str, Alert],
+        candidates: Optional[Dict[str, Alert]] = None
     ) -> Optional[Alert]:
         """
         Find if alert is a duplicate of an active alert.
@@ -50,11 +51,13 @@ class AlertDeduplicator:
         Args:
             alert: New alert to check
             active_alerts: Dictionary of active alerts (fingerprint -> alert)
+            candidates: Active alerts sharing the alert's source and
+                        severity; fuzzy matching scans only these when given
         
         Returns:
             Existing alert if duplicate found, None otherwise
         """
-        if not self.enabled:
+        if not self.enabled or self.is_unique(alert):
             return None
         
         # Exact fingerprint match
@@ -66,7 +69,20 @@ class AlertDeduplicator:
                 return existing
         
         # Fuzzy matching fallback
-        return self._fuzzy_match(alert, active_alerts)
+        return self._fuzzy_match(
+            alert,
+            active_alerts if candidates is None else candidates
+        )
+    
+    @staticmethod
+    def is_unique(alert: Alert) -> bool:
+        """
+        Check whether an alert opted out of deduplication.
+        
+        Sources whose events never repeat (e.g. deployments) set
+        ``metadata['unique']`` to true so no lookup is done for them.
+        """
+        return alert.metadata.get('unique') in (True, 'true')
     
     def _within_time_window(self, alert1: Alert, alert2: Alert) -> bool:
         """Check if two alerts are within the deduplication time window."""
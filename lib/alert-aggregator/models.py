@@ -10,6 +10,10 @@ from datetime import datetime
 from typing import Dict, Any, Optional, List
 import hashlib
 import json
+from json.encoder import encode_basestring_ascii as _encode_string
+
+# Fingerprint input, with keys in json.dumps(sort_keys=True) order
+_CANONICAL_FORMAT = '{"message": %s, "severity": %s, "source": %s, "title": %s}'
 
 
 class AlertSeverity(Enum):
@@ -30,6 +34,11 @@ class AlertStatus(Enum):
     DISMISSED = "dismissed"
 
 
+# Enum values -> members, so parsing a value needs no ValueError handling
+_SEVERITY_BY_VALUE = {member.value: member for member in AlertSeverity}
+_STATUS_BY_VALUE = {member.value: member for member in AlertStatus}
+
+
 class ChannelType(Enum):
     """Alert delivery channel types."""
     CONSOLE = "console"
@@ -84,16 +93,25 @@ class Alert:
         Returns:
             Hash string
         """
-        # Create a canonical representation for hashing
-        canonical = {
-            'source': self.source,
-            'severity': self.severity.value,
-            'title': self.title,
-            'message': self.message
-        }
+        # Canonical form: the same text json.dumps(..., sort_keys=True)
+        # produces for these four string fields, built without the dict and
+        # the general-purpose encoder
+        try:
+            canonical_str = _CANONICAL_FORMAT % (
+                _encode_string(self.message),
+                _encode_string(self.severity.value),
+                _encode_string(self.source),
+                _encode_string(self.title)
+            )
+        except TypeError:
+            # Non-string field; let json handle it
+            canonical_str = json.dumps({
+                'source': self.source,
+                'severity': self.severity.value,
+                'title': self.title,
+                'message': self.message
+            }, sort_keys=True)
         
-        # Normalize and hash
-        canonical_str = json.dumps(canonical, sort_keys=True)
         return hashlib.sha256(canonical_str.encode()).hexdigest()[:16]
     
     def merge_duplicate(self, other: 'Alert'):
@@ -257,13 +275,25 @@ class AlertStats:
         if alert.duplicate_count > 1:
             self.duplicates_merged += (alert.duplicate_count - 1)
     
+    def update_status(self, old_status: AlertStatus, new_status: AlertStatus):
+        """
+        Move one counted alert from one status to another.
+        
+        Args:
+            old_status: Status the alert was counted under
+            new_status: Status the alert has now
+        """
+        if old_status is not new_status:
+            self.by_status[old_status.value] -= 1
+            self.by_status[new_status.value] += 1
+    
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary."""
+        """Convert to dictionary (a snapshot; later updates don't show)."""
         return {
             'total_alerts': self.total_alerts,
-            'by_severity': self.by_severity,
-            'by_status': self.by_status,
-            'by_source': self.by_source,
+            'by_severity': dict(self.by_severity),
+            'by_status': dict(self.by_status),
+            'by_source': dict(self.by_source),
             'duplicates_merged': self.duplicates_merged,
             'deduplication_rate': (
                 self.duplicates_merged / self.total_alerts * 100
@@ -6,15 +6,31 @@ SQLite-based alert history storage for auditability and analysis.
 
 import sqlite3
 from pathlib import Path
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime, timedelta
+import atexit
 import logging
 import json
+import threading
+import time
 
 from .models import Alert, AlertSeverity, AlertStatus
 
 logger = logging.getLogger(__name__)
 
+# Columns that can be selected by name; each matches an Alert.to_dict() key
+ALERT_FIELDS = frozenset((
+    'id', 'source', 'severity', 'title', 'message', 'timestamp', 'status',
+    'tags', 'metadata', 'fingerprint', 'duplicate_count', 'first_seen',
+    'last_seen', 'acknowledged_at', 'resolved_at', 'acknowledged_by'
+))
+
+# Columns stored as JSON text
+_JSON_FIELDS = frozenset(('tags', 'metadata'))
+
+# Errors caused by a single alert's row rather than by the database
+_ROW_ERRORS = (sqlite3.IntegrityError, TypeError, ValueError)
+
 
 class AlertStorage:
     """
@@ -24,14 +40,30 @@ class AlertStorage:
     - Persistent alert history
     - Efficient querying
     - Automatic schema management
+    
+    Writes are batched: the first write after an idle period is committed
+    immediately, later ones within ``flush_interval`` seconds are held and
+    committed together in one transaction, by a timer at most
+    ``flush_interval`` seconds later (sooner once ``batch_size`` are held).
+    Repeated writes of one alert collapse into a single row write. Reads
+    flush pending writes first, and pending writes are flushed on close()
+    and at interpreter exit. Because the timer commits from its own thread,
+    every statement on the shared connection runs under one lock.
     """
     
-    def __init__(self, db_path: Optional[Path] = None):
+    def __init__(
+        self,
+        db_path: Optional[Path] = None,
+        flush_interval: float = 0.05,
+        batch_size: int = 500
+    ):
         """
         Initialize storage.
         
         Args:
             db_path: Path to SQLite database file
+            flush_interval: Longest time a write is held before it is committed
+            batch_size: Pending writes that force a commit
         """
         if db_path is None:
             db_path = Path.home() / '.alert-aggregator' / 'alerts.db'
@@ -43,6 +75,18 @@ class AlertStorage:
         self.conn.row_factory = sqlite3.Row
         
         self._init_schema()
+        
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        # Alerts awaiting INSERT / UPDATE, keyed by id
+        self._pending_inserts: Dict[str, Alert] = {}
+        self._pending_updates: Dict[str, Alert] = {}
+        self._last_flush = float('-inf')
+        self._lock = threading.RLock()
+        # Commits held writes once flush_interval has passed
+        self._timer: Optional[threading.Timer] = None
+        atexit.register(self.flush)
+        
         logger.info(f"Initialized alert storage: {self.db_path}")
     
     def _init_schema(self):
@@ -85,13 +129,128 @@ class AlertStorage:
         Args:
             alert: Alert to store
         """
-        self.conn.execute("""
-            INSERT INTO alerts (
-                id, source, severity, title, message, timestamp, status,
-                tags, metadata, fingerprint, duplicate_count,
-                first_seen, last_seen, acknowledged_at, resolved_at, acknowledged_by
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+        with self._lock:
+            self._pending_inserts[alert.id] = alert
+            self._pending_updates.pop(alert.id, None)
+            self._maybe_flush()
+        logger.debug(f"Stored alert: {alert.id}")
+    
+    def update_alert(self, alert: Alert):
+        """
+        Update an existing alert.
+        
+        Args:
+            alert: Alert to update
+        """
+        with self._lock:
+            if alert.id in self._pending_inserts:
+                # Not written yet; the insert will carry the new state
+                self._pending_inserts[alert.id] = alert
+            else:
+                self._pending_updates[alert.id] = alert
+            self._maybe_flush()
+    
+    def _maybe_flush(self):
+        """Flush if the batch is full or the flush interval has passed, else schedule a flush."""
+        pending = len(self._pending_inserts) + len(self._pending_updates)
+        elapsed = time.monotonic() - self._last_flush
+        if pending >= self.batch_size or elapsed >= self.flush_interval:
+            self.flush()
+        elif self._timer is None:
+            self._schedule_flush(self.flush_interval - elapsed)
+    
+    def _schedule_flush(self, delay: float):
+        """Start a timer that flushes after delay seconds."""
+        self._timer = threading.Timer(delay, self._timed_flush)
+        self._timer.daemon = True
+        self._timer.start()
+    
+    def _timed_flush(self):
+        """Flush from the timer thread, retrying later if the commit fails."""
+        try:
+            self.flush()
+        except sqlite3.Error as e:
+            logger.error(f"Failed to flush pending alerts: {e}")
+            with self._lock:
+                if self._timer is None and (self._pending_inserts or self._pending_updates):
+                    self._schedule_flush(self.flush_interval)
+    
+    def flush(self):
+        """
+        Commit all pending writes in one transaction.
+        
+        If the batch is rejected because of one alert (a constraint
+        violation or an unserializable field), the writes are retried one by
+        one and only the failing alerts are dropped, with an error logged.
+        Other database errors are raised and leave the writes pending.
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._last_flush = time.monotonic()
+            if not self._pending_inserts and not self._pending_updates:
+                return
+            
+            inserts = list(self._pending_inserts.values())
+            updates = list(self._pending_updates.values())
+            
+            try:
+                self._write(inserts, updates)
+            except _ROW_ERRORS:
+                # Isolate the bad rows so they don't take the batch with them
+                for alert in inserts:
+                    self._write_one(alert, insert=True)
+                for alert in updates:
+                    self._write_one(alert, insert=False)
+                return
+            
+            self._pending_inserts.clear()
+            self._pending_updates.clear()
+            logger.debug(f"Flushed {len(inserts)} inserts and {len(updates)} updates")
+    
+    def _write_one(self, alert: Alert, insert: bool):
+        """Commit one pending write, dropping it if the row is rejected."""
+        pending = self._pending_inserts if insert else self._pending_updates
+        try:
+            if insert:
+                self._write([alert], [])
+            else:
+                self._write([], [alert])
+        except _ROW_ERRORS as e:
+            logger.error(f"Dropped write of alert {alert.id}: {e}")
+        del pending[alert.id]
+    
+    def _write(self, inserts: List[Alert], updates: List[Alert]):
+        """Insert and update alerts in one transaction."""
+        insert_params = [self._insert_params(alert) for alert in inserts]
+        update_params = [self._update_params(alert) for alert in updates]
+        
+        with self.conn:
+            if insert_params:
+                self.conn.executemany("""
+                    INSERT INTO alerts (
+                        id, source, severity, title, message, timestamp, status,
+                        tags, metadata, fingerprint, duplicate_count,
+                        first_seen, last_seen, acknowledged_at, resolved_at, acknowledged_by
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, insert_params)
+            if update_params:
+                self.conn.executemany("""
+                    UPDATE alerts SET
+                        status = ?,
+                        duplicate_count = ?,
+                        last_seen = ?,
+                        acknowledged_at = ?,
+                        resolved_at = ?,
+                        acknowledged_by = ?,
+                        metadata = ?
+                    WHERE id = ?
+                """, update_params)
+    
+    def _insert_params(self, alert: Alert) -> tuple:
+        """Column values for inserting an alert."""
+        return (
             alert.id,
             alert.source,
             alert.severity.value,
@@ -108,29 +267,11 @@ class AlertStorage:
             alert.acknowledged_at.isoformat() if alert.acknowledged_at else None,
             alert.resolved_at.isoformat() if alert.resolved_at else None,
             alert.acknowledged_by
-        ))
-        
-        self.conn.commit()
-        logger.debug(f"Stored alert: {alert.id}")
+        )
     
-    def update_alert(self, alert: Alert):
-        """
-        Update an existing alert.
-        
-        Args:
-            alert: Alert to update
-        """
-        self.conn.execute("""
-            UPDATE alerts SET
-                status = ?,
-                duplicate_count = ?,
-                last_seen = ?,
-                acknowledged_at = ?,
-                resolved_at = ?,
-                acknowledged_by = ?,
-                metadata = ?
-            WHERE id = ?
-        """, (
+    def _update_params(self, alert: Alert) -> tuple:
+        """Column values for updating an alert's mutable fields."""
+        return (
             alert.status.value,
             alert.duplicate_count,
             alert.last_seen.isoformat() if alert.last_seen else None,
@@ -139,9 +280,7 @@ class AlertStorage:
             alert.acknowledged_by,
             json.dumps(alert.metadata),
             alert.id
-        ))
-        
-        self.conn.commit()
+        )
     
     def get_alert(self, alert_id: str) -> Optional[Alert]:
         """
@@ -153,12 +292,12 @@ class AlertStorage:
         Returns:
             Alert if found, None otherwise
         """
-        cursor = self.conn.execute(
-            "SELECT * FROM alerts WHERE id = ?",
-            (alert_id,)
-        )
-        
-        row = cursor.fetchone()
+        with self._lock:
+            self.flush()
+            row = self.conn.execute(
+                "SELECT * FROM alerts WHERE id = ?",
+                (alert_id,)
+            ).fetchone()
         
         if row:
             return self._row_to_alert(row)
@@ -184,7 +323,59 @@ class AlertStorage:
         Returns:
             List of alerts
         """
-        query = "SELECT * FROM alerts WHERE 1=1"
+        rows = self._query("*", severity, status, source, limit)
+        
+        return [self._row_to_alert(row) for row in rows]
+    
+    def query_alert_fields(
+        self,
+        fields: List[str],
+        severity: Optional[AlertSeverity] = None,
+        status: Optional[AlertStatus] = None,
+        source: Optional[str] = None,
+        limit: int = 100
+    ) -> List[dict]:
+        """
+        Query selected fields of alerts, without building Alert objects.
+        
+        Args:
+            fields: Field names as in Alert.to_dict()
+            severity: Filter by severity
+            status: Filter by status
+            source: Filter by source
+            limit: Maximum results
+        
+        Returns:
+            List of dictionaries holding only the requested fields
+        
+        Raises:
+            ValueError: If a field name is not an alert field
+        """
+        unknown = [name for name in fields if name not in ALERT_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown alert fields: {', '.join(unknown)}")
+        
+        rows = self._query(", ".join(fields), severity, status, source, limit)
+        
+        results = []
+        for row in rows:
+            item = dict(zip(fields, row))
+            for name in _JSON_FIELDS.intersection(fields):
+                default = [] if name == 'tags' else {}
+                item[name] = json.loads(item[name]) if item[name] else default
+            results.append(item)
+        return results
+    
+    def _query(
+        self,
+        columns: str,
+        severity: Optional[AlertSeverity],
+        status: Optional[AlertStatus],
+        source: Optional[str],
+        limit: int
+    ) -> List[sqlite3.Row]:
+        """Run a filtered, newest-first SELECT of the given columns."""
+        query = f"SELECT {columns} FROM alerts WHERE 1=1"
         params = []
         
         if severity:
@@ -202,9 +393,9 @@ class AlertStorage:
         query += " ORDER BY timestamp DESC LIMIT ?"
         params.append(limit)
         
-        cursor = self.conn.execute(query, params)
-        
-        return [self._row_to_alert(row) for row in cursor.fetchall()]
+        with self._lock:
+            self.flush()
+            return self.conn.execute(query, params).fetchall()
     
     def cleanup_old(self, days: int = 30) -> int:
         """
@@ -218,13 +409,14 @@ class AlertStorage:
         """
         cutoff = (datetime.now() - timedelta(days=days)).isoformat()
         
-        cursor = self.conn.execute("""
-            DELETE FROM alerts
-            WHERE status = 'resolved'
-            AND resolved_at < ?
-        """, (cutoff,))
-        
-        self.conn.commit()
+        with self._lock:
+            self.flush()
+            with self.conn:
+                cursor = self.conn.execute("""
+                    DELETE FROM alerts
+                    WHERE status = 'resolved'
+                    AND resolved_at < ?
+                """, (cutoff,))
         
         return cursor.rowcount
     
@@ -251,15 +443,16 @@ class AlertStorage:
     
     def get_stats(self) -> dict:
         """Get database statistics."""
-        cursor = self.conn.execute("SELECT COUNT(*) as total FROM alerts")
-        total = cursor.fetchone()['total']
-        
-        cursor = self.conn.execute("""
-            SELECT severity, COUNT(*) as count
-            FROM alerts
-            GROUP BY severity
-        """)
-        by_severity = {row['severity']: row['count'] for row in cursor.fetchall()}
+        with self._lock:
+            self.flush()
+            total = self.conn.execute("SELECT COUNT(*) as total FROM alerts").fetchone()['total']
+            
+            rows = self.conn.execute("""
+                SELECT severity, COUNT(*) as count
+                FROM alerts
+                GROUP BY severity
+            """).fetchall()
+        by_severity = {row['severity']: row['count'] for row in rows}
         
         return {
             'total_alerts': total,
@@ -268,7 +461,10 @@ class AlertStorage:
         }
     
     def close(self):
-        """Close database connection."""
-        self.conn.close()
+        """Flush pending writes and close database connection."""
+        with self._lock:
+            self.flush()
+            atexit.unregister(self.flush)
+            self.conn.close()
         logger.info("Closed alert storage")
 
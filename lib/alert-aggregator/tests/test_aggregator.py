@@ -0,0 +1,136 @@
+"""
+Test suite for aggregator.py
+
+Tests cover:
+- Duplicate merging
+- Acknowledging and resolving active alerts
+- Status statistics
+"""
+
+import pytest
+import importlib
+from pathlib import Path
+
+# Add lib directory to path for imports (the package name has a hyphen)
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+aggregator_pkg = importlib.import_module('alert-aggregator')
+
+AlertAggregator = aggregator_pkg.AlertAggregator
+AlertCollector = aggregator_pkg.AlertCollector
+AlertStatus = aggregator_pkg.AlertStatus
+
+
+@pytest.fixture
+def aggregator(tmp_path):
+    """Aggregator backed by a fresh database."""
+    aggregator = AlertAggregator(storage_path=tmp_path / 'alerts.db')
+    yield aggregator
+    aggregator.close()
+
+
+@pytest.fixture
+def collector():
+    """Alert collector."""
+    return AlertCollector()
+
+
+def make_alert(collector, title='Database Error', **kwargs):
+    """Collect an error alert."""
+    return collector.collect(
+        source='app',
+        severity='error',
+        title=title,
+        message='Connection failed',
+        **kwargs
+    )
+
+
+def test_duplicate_merged(aggregator, collector):
+    """Test a repeated alert is merged into the active one"""
+    first = aggregator.ingest(make_alert(collector))
+    result = aggregator.ingest(make_alert(collector))
+
+    assert result is first
+    assert first.duplicate_count == 2
+    assert aggregator.get_stats().duplicates_merged == 1
+
+
+def test_acknowledge_updates_live_alert(aggregator, collector):
+    """Test acknowledging mutates the active alert rather than a stored copy"""
+    alert = aggregator.ingest(make_alert(collector))
+
+    assert aggregator.acknowledge(alert.id, by='admin')
+    assert alert.status == AlertStatus.ACKNOWLEDGED
+    assert aggregator.active_alerts[alert.fingerprint] is alert
+
+    aggregator.ingest(make_alert(collector))
+    stored = aggregator.storage.get_alert(alert.id)
+    assert stored.duplicate_count == 2
+    assert stored.status == AlertStatus.ACKNOWLEDGED
+    assert stored.acknowledged_by == 'admin'
+
+
+def test_acknowledge_keeps_merged_duplicates(aggregator, collector):
+    """Test acknowledging does not overwrite duplicates merged before it"""
+    alert = aggregator.ingest(make_alert(collector))
+    aggregator.ingest(make_alert(collector))
+    aggregator.ingest(make_alert(collector))
+
+    aggregator.acknowledge(alert.id)
+
+    assert aggregator.storage.get_alert(alert.id).duplicate_count == 3
+
+
+def test_resolve_removes_active_alert(aggregator, collector):
+    """Test resolving drops the alert from the active set"""
+    alert = aggregator.ingest(make_alert(collector))
+
+    assert aggregator.resolve(alert.id)
+    assert alert.fingerprint not in aggregator.active_alerts
+    assert aggregator.storage.get_alert(alert.id).status == AlertStatus.RESOLVED
+
+
+def test_status_stats(aggregator, collector):
+    """Test status counts follow acknowledge and resolve"""
+    first = aggregator.ingest(make_alert(collector, title='First'))
+    second = aggregator.ingest(make_alert(collector, title='Second'))
+
+    aggregator.acknowledge(first.id)
+    aggregator.resolve(second.id)
+
+    by_status = aggregator.get_stats().by_status
+    assert (by_status['new'], by_status['acknowledged'], by_status['resolved']) == (0, 1, 1)
+
+
+def test_unknown_alert(aggregator):
+    """Test acknowledging or resolving an unknown ID fails"""
+    assert not aggregator.acknowledge('missing')
+    assert not aggregator.resolve('missing')
+
+
+def test_unique_alerts_share_fingerprint(aggregator, collector):
+    """Test alerts opted out of deduplication stay separate and resolvable"""
+    first = aggregator.ingest(make_alert(collector, metadata={'unique': True}))
+    second = aggregator.ingest(make_alert(collector, metadata={'unique': True}))
+
+    assert first is not second
+    assert first.fingerprint == second.fingerprint
+    assert first.fingerprint not in aggregator.active_alerts
+
+    assert aggregator.resolve(first.id)
+    assert aggregator.acknowledge(second.id)
+
+    by_status = aggregator.get_stats().by_status
+    assert (by_status['new'], by_status['acknowledged'], by_status['resolved']) == (0, 1, 1)
+    assert aggregator.storage.get_alert(second.id).status == AlertStatus.ACKNOWLEDGED
+
+
+def test_unique_alert_not_matched_by_later_duplicate(aggregator, collector):
+    """Test a regular alert is not merged into a unique one"""
+    unique = aggregator.ingest(make_alert(collector, metadata={'unique': True}))
+    regular = aggregator.ingest(make_alert(collector))
+
+    assert regular is not unique
+    assert unique.duplicate_count == 1
@@ -0,0 +1,88 @@
+"""
+Test suite for channels/file.py
+
+Tests cover:
+- Buffered writes reaching the file after the flush interval
+- Explicit flush and close
+- Reopening after close
+"""
+
+import pytest
+import time
+import importlib
+from pathlib import Path
+
+# Add lib directory to path for imports (the package name has a hyphen)
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+aggregator_pkg = importlib.import_module('alert-aggregator')
+channels = importlib.import_module('alert-aggregator.channels')
+
+AlertCollector = aggregator_pkg.AlertCollector
+FileChannel = channels.FileChannel
+
+
+@pytest.fixture
+def alerts():
+    """A few distinct alerts."""
+    collector = AlertCollector()
+    return [
+        collector.collect(source='app', severity='error', title=f'Alert {n}', message='Failed')
+        for n in range(3)
+    ]
+
+
+def written_lines(output_dir):
+    """Alert lines in the channel's log files."""
+    return [line for path in output_dir.iterdir() for line in path.read_text().splitlines()]
+
+
+def test_background_flush(tmp_path, alerts):
+    """Test buffered alerts are written after the flush interval"""
+    channel = FileChannel(output_dir=tmp_path, flush_interval=0.01)
+    try:
+        for alert in alerts:
+            channel.send(alert)
+        time.sleep(0.2)
+
+        assert len(written_lines(tmp_path)) == 3
+    finally:
+        channel.close()
+
+
+def test_flush(tmp_path, alerts):
+    """Test flush writes buffered alerts at once"""
+    channel = FileChannel(output_dir=tmp_path, flush_interval=10)
+    try:
+        channel.send(alerts[0])
+        channel.flush()
+
+        assert len(written_lines(tmp_path)) == 1
+    finally:
+        channel.close()
+
+
+def test_close_writes_and_stops_flusher(tmp_path, alerts):
+    """Test close writes buffered alerts and stops the flush thread"""
+    channel = FileChannel(output_dir=tmp_path, flush_interval=10)
+    for alert in alerts:
+        channel.send(alert)
+    flusher = channel._flusher
+
+    channel.close()
+
+    assert len(written_lines(tmp_path)) == 3
+    assert not flusher.is_alive()
+
+
+def test_send_after_close(tmp_path, alerts):
+    """Test a closed channel reopens its file on the next alert"""
+    channel = FileChannel(output_dir=tmp_path)
+    channel.send(alerts[0])
+    channel.close()
+
+    channel.send(alerts[1])
+    channel.close()
+
+    assert len(written_lines(tmp_path)) == 2
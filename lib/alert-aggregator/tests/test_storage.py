@@ -0,0 +1,227 @@
+"""
+Test suite for storage.py
+
+Tests cover:
+- Batched commits within the flush interval
+- Batch size limit
+- Reads flushing pending writes
+- Idle flush by the background timer
+- Failing rows not dropping the rest of a batch
+"""
+
+import pytest
+import sqlite3
+import time
+from datetime import datetime, timedelta
+import importlib
+from pathlib import Path
+
+# Add lib directory to path for imports (the package name has a hyphen)
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+aggregator_pkg = importlib.import_module('alert-aggregator')
+storage_module = importlib.import_module('alert-aggregator.storage')
+
+AlertCollector = aggregator_pkg.AlertCollector
+AlertStatus = aggregator_pkg.AlertStatus
+AlertStorage = storage_module.AlertStorage
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Path of a fresh database file."""
+    return tmp_path / 'alerts.db'
+
+
+@pytest.fixture
+def storage(db_path):
+    """Storage with a flush interval long enough to observe batching."""
+    storage = AlertStorage(db_path=db_path, flush_interval=0.2)
+    yield storage
+    storage.close()
+
+
+@pytest.fixture
+def collector():
+    """Alert collector."""
+    return AlertCollector()
+
+
+def make_alert(collector, n):
+    """Collect a distinct error alert."""
+    return collector.collect(
+        source='test',
+        severity='error',
+        title=f'Alert {n}',
+        message='Something failed'
+    )
+
+
+def committed_count(db_path):
+    """Rows visible to another connection."""
+    conn = sqlite3.connect(str(db_path))
+    try:
+        return conn.execute("SELECT COUNT(*) FROM alerts").fetchone()[0]
+    finally:
+        conn.close()
+
+
+class TestBatching:
+    """Test batched commits."""
+
+    def test_first_write_committed_immediately(self, storage, db_path, collector):
+        """First write after an idle period is committed at once."""
+        storage.store_alert(make_alert(collector, 0))
+
+        assert committed_count(db_path) == 1
+
+    def test_writes_within_interval_are_held(self, storage, db_path, collector):
+        """Later writes within the interval are held for one transaction."""
+        for n in range(3):
+            storage.store_alert(make_alert(collector, n))
+
+        assert committed_count(db_path) == 1
+
+        storage.flush()
+        assert committed_count(db_path) == 3
+
+    def test_batch_size_forces_commit(self, db_path, collector):
+        """Holding batch_size writes commits them without waiting."""
+        storage = AlertStorage(db_path=db_path, flush_interval=10, batch_size=3)
+        try:
+            for n in range(4):
+                storage.store_alert(make_alert(collector, n))
+
+            assert committed_count(db_path) == 4
+        finally:
+            storage.close()
+
+    def test_update_of_pending_insert_is_merged(self, storage, db_path, collector):
+        """Updating a held alert writes its latest state in the insert."""
+        storage.store_alert(make_alert(collector, 0))
+        alert = make_alert(collector, 1)
+        storage.store_alert(alert)
+        alert.status = AlertStatus.ACKNOWLEDGED
+        storage.update_alert(alert)
+
+        assert storage.get_alert(alert.id).status == AlertStatus.ACKNOWLEDGED
+
+    def test_close_flushes(self, db_path, collector):
+        """Closing commits held writes."""
+        storage = AlertStorage(db_path=db_path, flush_interval=10)
+        for n in range(3):
+            storage.store_alert(make_alert(collector, n))
+        storage.close()
+
+        assert committed_count(db_path) == 3
+
+
+class TestReadYourWrites:
+    """Test that reads see held writes."""
+
+    def test_get_alert(self, storage, collector):
+        """get_alert finds a held alert."""
+        storage.store_alert(make_alert(collector, 0))
+        alert = make_alert(collector, 1)
+        storage.store_alert(alert)
+
+        assert storage.get_alert(alert.id).id == alert.id
+
+    def test_query_alerts(self, storage, collector):
+        """query_alerts includes held alerts."""
+        for n in range(3):
+            storage.store_alert(make_alert(collector, n))
+
+        assert len(storage.query_alerts()) == 3
+
+    def test_query_alert_fields(self, storage, collector):
+        """query_alert_fields includes held alerts."""
+        for n in range(3):
+            storage.store_alert(make_alert(collector, n))
+
+        assert len(storage.query_alert_fields(['id'])) == 3
+
+    def test_get_stats(self, storage, collector):
+        """get_stats counts held alerts."""
+        for n in range(3):
+            storage.store_alert(make_alert(collector, n))
+
+        assert storage.get_stats()['total_alerts'] == 3
+
+
+class TestIdleFlush:
+    """Test the background flush timer."""
+
+    def test_held_writes_committed_when_idle(self, db_path, collector):
+        """Held writes are committed within the flush interval without further calls."""
+        storage = AlertStorage(db_path=db_path, flush_interval=0.05)
+        try:
+            storage.store_alert(make_alert(collector, 0))
+            storage.store_alert(make_alert(collector, 1))
+            assert committed_count(db_path) == 1
+
+            time.sleep(0.2)
+
+            assert committed_count(db_path) == 2
+        finally:
+            storage.close()
+
+    def test_no_timer_when_nothing_held(self, storage, collector):
+        """A write committed immediately does not start a timer."""
+        storage.store_alert(make_alert(collector, 0))
+
+        assert storage._timer is None
+
+
+class TestFailedWrites:
+    """Test flushes with rows the database rejects."""
+
+    def test_bad_row_does_not_drop_batch(self, storage, db_path, collector):
+        """Only the rejected alert is dropped; the rest of the batch is committed."""
+        first = make_alert(collector, 0)
+        storage.store_alert(first)
+        storage.store_alert(make_alert(collector, 1))
+        bad = make_alert(collector, 2)
+        bad.metadata = {'unserializable': object()}
+        storage.store_alert(bad)
+        storage.store_alert(make_alert(collector, 3))
+
+        storage.flush()
+
+        assert committed_count(db_path) == 3
+        assert storage.get_alert(bad.id) is None
+
+    def test_database_error_keeps_writes_pending(self, storage, db_path, collector):
+        """Writes stay pending when the database itself fails."""
+        storage.store_alert(make_alert(collector, 0))
+        storage.store_alert(make_alert(collector, 1))
+
+        conn = sqlite3.connect(str(db_path))
+        try:
+            conn.execute("BEGIN EXCLUSIVE")
+            storage.conn.execute("PRAGMA busy_timeout = 0")
+            with pytest.raises(sqlite3.OperationalError):
+                storage.flush()
+        finally:
+            conn.rollback()
+            conn.close()
+
+        storage.flush()
+        assert committed_count(db_path) == 2
+
+
+class TestCleanup:
+    """Test removing old resolved alerts."""
+
+    def test_cleanup_with_held_writes(self, storage, db_path, collector):
+        """Old resolved alerts are deleted and held writes are kept."""
+        old = make_alert(collector, 0)
+        old.status = AlertStatus.RESOLVED
+        old.resolved_at = datetime.now() - timedelta(days=60)
+        storage.store_alert(old)
+        storage.store_alert(make_alert(collector, 1))
+
+        assert storage.cleanup_old(days=30) == 1
+        assert committed_count(db_path) == 1
+        assert storage.get_alert(old.id) is None